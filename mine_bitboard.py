@@ -0,0 +1,255 @@
+import argparse
+import importlib
+import multiprocessing
+import os
+import random
+import time
+
+from mine_generator import sample_mines
+
+
+DIFFICULTIES = {
+    "beginner": (10, 10, 15),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+# Neighbour masks per bit index, shared by all boards of a size
+_NEIGHBOURS = {}
+
+# Game states
+PLAYING = "playing"
+WON = "won"
+LOST = "lost"
+
+
+class BitBoard:
+    """Headless Minesweeper with mines, revealed and flagged cells as int bitsets.
+
+    Bit r * (cols + 1) + c is cell (r, c); the extra guard column stays
+    zero so shifting by one column can't wrap into the next row. Flood
+    fills, chords and win checks are a handful of bitwise operations on
+    whole boards.
+    """
+
+    def __init__(self, rows, cols, num_mines):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.width = cols + 1
+
+        row_mask = (1 << cols) - 1
+        self.cells = 0
+        for r in range(rows):
+            self.cells |= row_mask << (r * self.width)
+
+        # around[i] is the mask of the cells next to bit i (not including it)
+        self.around = _NEIGHBOURS.get((rows, cols))
+        if self.around is None:
+            self.around = [self.spread(1 << i) & ~(1 << i) for i in range(rows * self.width)]
+            _NEIGHBOURS[(rows, cols)] = self.around
+
+        self.reset()
+
+    def reset(self):
+        self.mines = 0
+        self.revealed = 0
+        self.flagged = 0
+        self.empty = 0  # safe cells with no adjacent mine
+        self.state = PLAYING
+        self.clicks = 0
+
+    def bit(self, row, col):
+        return 1 << (row * self.width + col)
+
+    def cell(self, bit):
+        """(row, col) of a single-bit mask."""
+        return divmod(bit.bit_length() - 1, self.width)
+
+    def spread(self, bits):
+        """Bits plus all their neighbours, clipped to the board."""
+        bits |= (bits << 1) | (bits >> 1)
+        bits |= (bits << self.width) | (bits >> self.width)
+        return bits & self.cells
+
+    def place_mines(self, first_row, first_col, rng=random):
+        """Lay mines avoiding the first click and its neighbours."""
+        self.mines = 0
+        for i in sample_mines(self.rows, self.cols, self.num_mines, first_row, first_col, rng):
+            self.mines |= self.bit(*divmod(i, self.cols))
+        self.empty = self.cells & ~self.mines & ~self.spread(self.mines)
+
+    def count(self, row, col):
+        """Number of mines around a cell."""
+        return (self.around[row * self.width + col] & self.mines).bit_count()
+
+    def flood(self, bits):
+        """Cells revealed by opening bits: grow through empty cells until stable."""
+        region = bits
+        while True:
+            grown = region | (self.spread(region & self.empty) & ~self.flagged)
+            if grown == region:
+                return region
+            region = grown
+
+    def reveal(self, row, col):
+        if self.state != PLAYING:
+            return self.state
+        bit = self.bit(row, col)
+        if (self.revealed | self.flagged) & bit:
+            return self.state
+
+        self.clicks += 1
+        if not self.mines:
+            self.place_mines(row, col)
+        return self.open(bit)
+
+    def open(self, bits):
+        if bits & self.mines:
+            self.state = LOST
+            return self.state
+
+        self.revealed |= self.flood(bits)
+        if self.revealed == self.cells & ~self.mines:
+            self.state = WON
+        return self.state
+
+    def flag(self, row, col):
+        """Toggle a flag on a hidden cell."""
+        bit = self.bit(row, col)
+        if self.state == PLAYING and not self.revealed & bit:
+            self.clicks += 1
+            self.flagged ^= bit
+        return self.state
+
+    def chord(self, row, col):
+        """Open all unflagged neighbours of a number whose flags are all placed."""
+        bit = self.bit(row, col)
+        if self.state != PLAYING or not self.revealed & bit:
+            return self.state
+
+        around = self.around[bit.bit_length() - 1]
+        if (around & self.flagged).bit_count() != (around & self.mines).bit_count():
+            return self.state
+
+        self.clicks += 1
+        hidden = around & ~self.revealed & ~self.flagged
+        return self.open(hidden) if hidden else self.state
+
+    def bits(self, mask):
+        """Yield the single-bit masks set in mask."""
+        while mask:
+            low = mask & -mask
+            yield low
+            mask ^= low
+
+
+def random_strategy(game, rng):
+    """Open a random hidden cell."""
+    hidden = list(game.bits(game.cells & ~game.revealed & ~game.flagged))
+    return [("reveal", *game.cell(rng.choice(hidden)))]
+
+
+def simple_strategy(game, rng):
+    """Flag and chord from single-cell rules, guess randomly when stuck."""
+    actions = []
+    hidden = game.cells & ~game.revealed
+    # Revealed numbers that still touch hidden cells
+    border = game.revealed & ~game.empty & game.spread(hidden)
+
+    flagged = game.flagged
+    for bit in game.bits(border):
+        around = game.around[bit.bit_length() - 1]
+        count = (around & game.mines).bit_count()  # the number shown on the cell
+        covered = around & hidden
+        if covered.bit_count() == count:
+            for mine in game.bits(covered & ~flagged):
+                actions.append(("flag", *game.cell(mine)))
+            flagged |= covered
+        if (covered & flagged).bit_count() == count and covered & ~flagged:
+            actions.append(("chord", *game.cell(bit)))
+
+    return actions or random_strategy(game, rng)
+
+
+STRATEGIES = {
+    "random": random_strategy,
+    "simple": simple_strategy,
+}
+
+
+def load_strategy(name):
+    """A built-in strategy, or "module:function" for a custom one."""
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def play(rows, cols, num_mines, strategy, rng):
+    """Play one game; return (won, clicks)."""
+    game = BitBoard(rows, cols, num_mines)
+    game.place_mines(rows // 2, cols // 2, rng)
+    game.clicks = 1
+    game.open(game.bit(rows // 2, cols // 2))
+
+    while game.state == PLAYING:
+        for action, row, col in strategy(game, rng):
+            getattr(game, action)(row, col)
+            if game.state != PLAYING:
+                break
+    return game.state == WON, game.clicks
+
+
+def play_batch(args):
+    """Worker entry point: play games with consecutive seeds."""
+    rows, cols, num_mines, strategy_name, first_seed, games = args
+    strategy = load_strategy(strategy_name)
+    wins = clicks = 0
+    for seed in range(first_seed, first_seed + games):
+        won, game_clicks = play(rows, cols, num_mines, strategy, random.Random(seed))
+        wins += won
+        clicks += game_clicks
+    return wins, clicks, games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Minesweeper games on all cores")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="expert")
+    parser.add_argument("--size", metavar="ROWSxCOLSxMINES", help="custom board, overrides --difficulty")
+    parser.add_argument("--strategy", default="simple",
+                        help=f"one of {', '.join(STRATEGIES)} or module:function")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=1000, help="games per work item")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.size:
+        rows, cols, num_mines = (int(n) for n in args.size.split("x"))
+    else:
+        rows, cols, num_mines = DIFFICULTIES[args.difficulty]
+    load_strategy(args.strategy)  # fail early on a bad name
+
+    work = []
+    for start in range(0, args.games, args.batch):
+        games = min(args.batch, args.games - start)
+        work.append((rows, cols, num_mines, args.strategy, args.seed + start, games))
+
+    wins = clicks = games = 0
+    begin = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        for batch_wins, batch_clicks, batch_games in pool.imap_unordered(play_batch, work):
+            wins += batch_wins
+            clicks += batch_clicks
+            games += batch_games
+    elapsed = time.perf_counter() - begin
+
+    print(f"{games} games of {rows}x{cols} with {num_mines} mines, strategy {args.strategy}, "
+          f"{args.processes} processes")
+    print(f"win rate {wins / games:.2%}, {clicks / games:.1f} clicks per game, "
+          f"{games / elapsed:,.0f} games/s ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import dbm
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict, deque
+
+from mine_field import NO_MARK, FLAG, QUESTION, pack_states, unpack_states
+
+CHUNK = 16  # chunks are CHUNK x CHUNK cells
+
+# Below this density empty regions can percolate and a flood fill never ends
+MIN_DENSITY = 0.15
+
+
+class Chunk:
+    """Mines and player state of one CHUNK x CHUNK piece of the plane."""
+
+    def __init__(self, mines):
+        self.mines = mines
+        self.revealed = bytearray(CHUNK * CHUNK)
+        self.marks = bytearray(CHUNK * CHUNK)
+        self.dirty = False  # changed since it was generated or loaded
+
+
+# Rough footprint of a cached chunk: three cell arrays plus the object around them
+CHUNK_BYTES = 4 * sys.getsizeof(bytearray(CHUNK * CHUNK))
+
+
+class EndlessWorld:
+    """An unbounded Minesweeper plane with the same cell API as MineField.
+
+    The plane is cut into chunks that are generated when first needed,
+    from the world seed and the chunk coordinates alone, so a chunk can
+    be dropped and rebuilt identically. Loaded chunks sit in an LRU cache
+    capped at cache_bytes. An evicted chunk the player changed writes its
+    packed cell states to an on-disk store and gets them back when it is
+    loaded again; untouched chunks are simply forgotten.
+
+    The 3x3 cells around (0, 0) are always safe, so the game starts by
+    opening (0, 0).
+    """
+
+    def __init__(self, seed=None, density=0.18, cache_bytes=4 << 20, store_path=None):
+        if not MIN_DENSITY <= density < 1:
+            raise ValueError(f"mine density must be between {MIN_DENSITY} and 1")
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.density = density
+        self.cache_bytes = max(cache_bytes, 16 * CHUNK_BYTES)
+        self.chunks = OrderedDict()  # (chunk row, chunk col) -> Chunk, least recently used first
+        self.flags = 0
+        self.cells_revealed = 0
+
+        # Without a path the store only lives as long as the world
+        self.store_dir = None
+        if store_path is None:
+            self.store_dir = tempfile.mkdtemp(prefix="minesweeper-")
+            store_path = os.path.join(self.store_dir, "chunks")
+        self.store = dbm.open(store_path, "c")
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+        if self.store_dir is not None:
+            shutil.rmtree(self.store_dir, ignore_errors=True)
+            self.store_dir = None
+
+    def generate_mines(self, chunk_row, chunk_col):
+        """Mine bytes of a chunk; the same for a given seed and position."""
+        rng = random.Random(f"{self.seed}:{chunk_row}:{chunk_col}")
+        density = self.density
+        mines = bytearray(rng.random() < density for _ in range(CHUNK * CHUNK))
+
+        if chunk_row in (-1, 0) and chunk_col in (-1, 0):
+            # Keep the start area clear
+            for row in (-1, 0, 1):
+                for col in (-1, 0, 1):
+                    if row // CHUNK == chunk_row and col // CHUNK == chunk_col:
+                        mines[(row % CHUNK) * CHUNK + col % CHUNK] = 0
+        return mines
+
+    def chunk(self, chunk_row, chunk_col):
+        """The chunk at these chunk coordinates, loading it if needed."""
+        key = (chunk_row, chunk_col)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = Chunk(self.generate_mines(chunk_row, chunk_col))
+        packed = self.store.get(self.store_key(key))
+        if packed is not None:
+            chunk.revealed, chunk.marks = unpack_states(packed, CHUNK * CHUNK)
+        self.chunks[key] = chunk
+
+        while len(self.chunks) * CHUNK_BYTES > self.cache_bytes:
+            self.evict()
+        return chunk
+
+    def evict(self):
+        key, chunk = self.chunks.popitem(last=False)
+        if chunk.dirty:
+            self.store[self.store_key(key)] = pack_states(chunk.revealed, chunk.marks)
+
+    @staticmethod
+    def store_key(key):
+        return f"{key[0]},{key[1]}".encode()
+
+    def locate(self, row, col):
+        """(chunk, index in chunk) of a cell."""
+        return self.chunk(row // CHUNK, col // CHUNK), (row % CHUNK) * CHUNK + col % CHUNK
+
+    def is_revealed(self, row, col):
+        chunk, i = self.locate(row, col)
+        return chunk.revealed[i] != 0
+
+    def mark(self, row, col):
+        chunk, i = self.locate(row, col)
+        return chunk.marks[i]
+
+    def is_mine(self, row, col):
+        chunk, i = self.locate(row, col)
+        return chunk.mines[i] != 0
+
+    def count(self, row, col):
+        """-1 for a mine, else the number of mines around the cell."""
+        if self.is_mine(row, col):
+            return -1
+        return sum(self.is_mine(r, c)
+                   for r in (row - 1, row, row + 1)
+                   for c in (col - 1, col, col + 1))
+
+    @property
+    def cleared(self):
+        # There is always more plane to clear
+        return False
+
+    def cycle_mark(self, row, col, question_marks=True):
+        """Move a hidden cell to its next mark and return it, None if revealed."""
+        chunk, i = self.locate(row, col)
+        if chunk.revealed[i]:
+            return None
+
+        mark = chunk.marks[i]
+        if mark == NO_MARK:
+            new = FLAG
+        elif mark == FLAG and question_marks:
+            new = QUESTION
+        else:
+            new = NO_MARK
+
+        self.flags += (new == FLAG) - (mark == FLAG)
+        chunk.marks[i] = new
+        chunk.dirty = True
+        return new
+
+    def open_cell(self, row, col):
+        """Reveal one cell if it is hidden and unflagged; returns its count or None."""
+        chunk, i = self.locate(row, col)
+        if chunk.revealed[i] or chunk.marks[i] == FLAG:
+            return None
+        chunk.revealed[i] = 1
+        chunk.marks[i] = NO_MARK
+        chunk.dirty = True
+        return self.count(row, col)
+
+    def flood(self, row, col):
+        """Reveal and return the cells a click on (row, col) opens.
+
+        Same breadth-first fill as MineField.flood, loading chunks as the
+        fill reaches them.
+        """
+        count = self.open_cell(row, col)
+        if count is None:
+            return []
+
+        region = [(row, col)]
+        queue = deque([(row, col, count)])
+        while queue:
+            r, c, count = queue.popleft()
+            if count != 0:
+                continue
+            for nr in (r - 1, r, r + 1):
+                for nc in (c - 1, c, c + 1):
+                    count = self.open_cell(nr, nc)
+                    if count is not None:
+                        region.append((nr, nc))
+                        queue.append((nr, nc, count))
+
+        self.cells_revealed += len(region)
+        return region
+
+    def chord_cells(self, row, col):
+        """Hidden unflagged neighbours to open by chording on (row, col)."""
+        count = self.count(row, col)
+        if count <= 0 or not self.is_revealed(row, col):
+            return []
+
+        flags = 0
+        cells = []
+        for r in (row - 1, row, row + 1):
+            for c in (col - 1, col, col + 1):
+                if self.is_revealed(r, c):
+                    continue
+                if self.mark(r, c) == FLAG:
+                    flags += 1
+                else:
+                    cells.append((r, c))
+        return cells if flags == count else []
@@ -0,0 +1,157 @@
+from collections import deque
+
+# Player marks on hidden cells
+NO_MARK = 0
+FLAG = 1
+QUESTION = 2
+
+
+def pack_states(revealed, marks):
+    """Cell states at 2 bits each: 0 hidden, 1 revealed, 2 flag, 3 question mark."""
+    packed = bytearray((len(revealed) + 3) // 4)
+    for i, is_revealed in enumerate(revealed):
+        state = 1 if is_revealed else marks[i] + 1 if marks[i] else 0
+        packed[i >> 2] |= state << ((i & 3) << 1)
+    return bytes(packed)
+
+
+def unpack_states(packed, count):
+    """(revealed, marks) bytearrays for the first count cells of packed states."""
+    revealed = bytearray(count)
+    marks = bytearray(count)
+    for i in range(count):
+        state = (packed[i >> 2] >> ((i & 3) << 1)) & 3
+        if state == 1:
+            revealed[i] = 1
+        elif state:
+            marks[i] = state - 1
+    return revealed, marks
+
+
+class MineField:
+    """State of one Minesweeper game, independent of the UI.
+
+    board holds the counts (-1 for mines), revealed and marks hold one
+    byte per cell indexed by row * cols + col. Flags and revealed cells
+    are counted as they change, so the mine counter and the win check
+    never scan the board.
+    """
+
+    def __init__(self, rows, cols, num_mines):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.board = [[0] * cols for _ in range(rows)]
+        self.revealed = bytearray(rows * cols)
+        self.marks = bytearray(rows * cols)
+        self.flags = 0
+        self.cells_revealed = 0
+
+    @property
+    def mines_left(self):
+        return self.num_mines - self.flags
+
+    @property
+    def cleared(self):
+        """True once every safe cell is revealed."""
+        return self.cells_revealed == self.rows * self.cols - self.num_mines
+
+    def is_revealed(self, row, col):
+        return self.revealed[row * self.cols + col] != 0
+
+    def mark(self, row, col):
+        return self.marks[row * self.cols + col]
+
+    def is_mine(self, row, col):
+        return self.board[row][col] == -1
+
+    def count(self, row, col):
+        """-1 for a mine, else the number of mines around the cell."""
+        return self.board[row][col]
+
+    def cycle_mark(self, row, col, question_marks=True):
+        """Move a hidden cell to its next mark and return it.
+
+        Marks go none -> flag -> question -> none, skipping the question
+        mark when it is turned off. Returns None for revealed cells.
+        """
+        i = row * self.cols + col
+        if self.revealed[i]:
+            return None
+
+        mark = self.marks[i]
+        if mark == NO_MARK:
+            new = FLAG
+        elif mark == FLAG and question_marks:
+            new = QUESTION
+        else:
+            new = NO_MARK
+
+        self.flags += (new == FLAG) - (mark == FLAG)
+        self.marks[i] = new
+        return new
+
+    def flood(self, row, col):
+        """Reveal and return the cells a click on (row, col) opens.
+
+        Breadth-first over the board: empty cells open their neighbours,
+        numbered cells stop the fill. Flagged cells are never opened, a
+        question mark is cleared when its cell opens. Each cell is queued
+        at most once.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+
+        cols = self.cols
+        revealed = self.revealed
+        marks = self.marks
+        i = row * cols + col
+        if revealed[i] or marks[i] == FLAG:
+            return []
+
+        revealed[i] = 1
+        marks[i] = NO_MARK
+        region = [(row, col)]
+        queue = deque(region)
+
+        while queue:
+            r, c = queue.popleft()
+            if self.board[r][c] != 0:
+                continue
+
+            # Empty cell - reveal adjacent cells
+            for nr in range(max(r - 1, 0), min(r + 2, self.rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                    i = nr * cols + nc
+                    if revealed[i] or marks[i] == FLAG:
+                        continue
+                    revealed[i] = 1
+                    marks[i] = NO_MARK
+                    region.append((nr, nc))
+                    queue.append((nr, nc))
+
+        self.cells_revealed += len(region)
+        return region
+
+    def chord_cells(self, row, col):
+        """Hidden unflagged neighbours to open by chording on (row, col).
+
+        Only a revealed number with exactly that many flags around it
+        chords; otherwise the list is empty.
+        """
+        count = self.board[row][col]
+        if count <= 0 or not self.is_revealed(row, col):
+            return []
+
+        flags = 0
+        cells = []
+        for r in range(max(row - 1, 0), min(row + 2, self.rows)):
+            for c in range(max(col - 1, 0), min(col + 2, self.cols)):
+                i = r * self.cols + c
+                if self.revealed[i]:
+                    continue
+                if self.marks[i] == FLAG:
+                    flags += 1
+                else:
+                    cells.append((r, c))
+        return cells if flags == count else []
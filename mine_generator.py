@@ -0,0 +1,160 @@
+import argparse
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # the game still works without NumPy, counting is just slower
+    np = None
+
+
+def excluded_cells(rows, cols, first_row, first_col):
+    """Flat indices of the first click and its neighbours, which stay mine-free."""
+    return sorted(
+        r * cols + c
+        for r in range(max(first_row - 1, 0), min(first_row + 2, rows))
+        for c in range(max(first_col - 1, 0), min(first_col + 2, cols))
+    )
+
+
+def sample_mines(rows, cols, num_mines, first_row, first_col, rng=random):
+    """Flat indices of num_mines distinct cells outside the first-click area.
+
+    Samples without replacement from the allowed cells, so the cost doesn't
+    depend on the mine density.
+    """
+    excluded = excluded_cells(rows, cols, first_row, first_col)
+    allowed = rows * cols - len(excluded)
+    if num_mines > allowed:
+        raise ValueError(f"{num_mines} mines don't fit on a {rows}x{cols} board")
+
+    mines = []
+    for i in rng.sample(range(allowed), num_mines):
+        # Shift past each excluded cell at or below this position
+        for cell in excluded:
+            if i >= cell:
+                i += 1
+        mines.append(i)
+    return mines
+
+
+def neighbour_counts(rows, cols, mines):
+    """Board as a list of rows: -1 for mines, else the adjacent mine count."""
+    if np is not None:
+        grid = np.zeros(rows * cols, dtype=np.int8)
+        grid[mines] = 1
+        board = count_grid(grid.reshape(rows, cols))
+        return board.tolist()
+
+    # Pure Python: 3-wide row sums, then add up three neighbouring rows
+    is_mine = [[0] * cols for _ in range(rows)]
+    for i in mines:
+        is_mine[i // cols][i % cols] = 1
+
+    row_sums = []
+    for line in is_mine:
+        padded = [0] + line + [0]
+        row_sums.append([padded[c] + padded[c + 1] + padded[c + 2] for c in range(cols)])
+
+    zero = [0] * cols
+    board = []
+    for r in range(rows):
+        above = row_sums[r - 1] if r > 0 else zero
+        below = row_sums[r + 1] if r < rows - 1 else zero
+        board.append([
+            -1 if is_mine[r][c] else above[c] + row_sums[r][c] + below[c] - is_mine[r][c]
+            for c in range(cols)
+        ])
+    return board
+
+
+def count_grid(mines):
+    """NumPy version of the counts for a (..., rows, cols) 0/1 mine array.
+
+    Sums the eight shifted slices of a zero-padded copy, so any number of
+    leading batch dimensions is handled at once.
+    """
+    rows, cols = mines.shape[-2:]
+    pad = [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mines.astype(np.int8), pad)
+
+    counts = np.zeros(mines.shape, dtype=np.int8)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr != 1 or dc != 1:
+                counts += padded[..., dr:dr + rows, dc:dc + cols]
+    return np.where(mines.astype(bool), np.int8(-1), counts)
+
+
+def generate_board(rows, cols, num_mines, first_row, first_col, rng=random):
+    """Random board with no mine on or next to the first click."""
+    mines = sample_mines(rows, cols, num_mines, first_row, first_col, rng)
+    return neighbour_counts(rows, cols, mines)
+
+
+def generate_boards(count, rows, cols, num_mines, first_row, first_col, seed=None):
+    """Many boards at once as an int8 (count, rows, cols) array. Needs NumPy.
+
+    Each board takes the num_mines allowed cells with the smallest random
+    keys, which is sampling without replacement for the whole batch in a
+    few array operations.
+    """
+    if np is None:
+        raise RuntimeError("generate_boards needs NumPy")
+
+    excluded = excluded_cells(rows, cols, first_row, first_col)
+    if not 0 < num_mines <= rows * cols - len(excluded):
+        raise ValueError(f"{num_mines} mines don't fit on a {rows}x{cols} board")
+
+    rng = np.random.default_rng(seed)
+    keys = rng.random((count, rows * cols))
+    keys[:, excluded] = np.inf
+
+    chosen = np.argpartition(keys, num_mines - 1, axis=1)[:, :num_mines]
+    mines = np.zeros((count, rows * cols), dtype=np.int8)
+    np.put_along_axis(mines, chosen, 1, axis=1)
+    return count_grid(mines.reshape(count, rows, cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check batch Minesweeper board generation")
+    parser.add_argument("--boards", type=int, default=1000000)
+    parser.add_argument("--size", metavar="ROWSxCOLSxMINES", default="16x30x99")
+    parser.add_argument("--first-click", metavar="ROW,COL", default="0,0")
+    parser.add_argument("--batch", type=int, default=10000, help="boards generated per call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if np is None:
+        parser.error("batch generation needs NumPy")
+
+    rows, cols, num_mines = (int(n) for n in args.size.split("x"))
+    first_row, first_col = (int(n) for n in args.first_click.split(","))
+    excluded = excluded_cells(rows, cols, first_row, first_col)
+
+    begin = time.perf_counter()
+    for start in range(0, args.boards, args.batch):
+        count = min(args.batch, args.boards - start)
+        boards = generate_boards(count, rows, cols, num_mines, first_row, first_col, args.seed + start)
+        # Every board has all its mines and none in the first-click area
+        flat = boards.reshape(count, rows * cols)
+        if not ((flat == -1).sum(axis=1) == num_mines).all():
+            raise RuntimeError("a board has the wrong number of mines")
+        if (flat[:, excluded] == -1).any():
+            raise RuntimeError("a board has a mine in the first-click area")
+    elapsed = time.perf_counter() - begin
+
+    # One at a time for comparison, on a sample
+    single = min(args.boards, 10000)
+    rng = random.Random(args.seed)
+    begin = time.perf_counter()
+    for _ in range(single):
+        generate_board(rows, cols, num_mines, first_row, first_col, rng)
+    single_elapsed = time.perf_counter() - begin
+
+    print(f"{args.boards} boards of {rows}x{cols} with {num_mines} mines checked")
+    print(f"generate_boards {args.boards / elapsed:,.0f} boards/s ({elapsed:.1f}s), "
+          f"generate_board {single / single_elapsed:,.0f} boards/s")
+
+
+if __name__ == "__main__":
+    main()
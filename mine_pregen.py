@@ -0,0 +1,171 @@
+import multiprocessing
+import random
+import threading
+from collections import deque
+
+from mine_generator import generate_board
+from mine_solver import MineSolver
+
+
+def open_region(board, rows, cols, revealed, row, col):
+    """Reveal (row, col) like a click, flooding through empty cells."""
+    if revealed[row * cols + col]:
+        return
+    revealed[row * cols + col] = 1
+    queue = deque([(row, col)])
+    while queue:
+        r, c = queue.popleft()
+        if board[r][c] != 0:
+            continue
+        for nr in range(max(r - 1, 0), min(r + 2, rows)):
+            for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                if not revealed[nr * cols + nc]:
+                    revealed[nr * cols + nc] = 1
+                    queue.append((nr, nc))
+
+
+def is_no_guess(board, rows, cols, num_mines, first_row, first_col):
+    """True if the solver clears the board from the first click without guessing."""
+    revealed = bytearray(rows * cols)
+    open_region(board, rows, cols, revealed, first_row, first_col)
+    solver = MineSolver(rows, cols, num_mines)
+    target = rows * cols - num_mines
+
+    while sum(revealed) < target:
+        safe = solver.solve(revealed, board).safe
+        if not safe:
+            return False
+        for row, col in safe:
+            open_region(board, rows, cols, revealed, row, col)
+    return True
+
+
+def opening(board, rows, cols, first_row, first_col):
+    """Flat indices of the empty cells opened by the first click.
+
+    A first click on any of them reveals exactly the same region.
+    """
+    revealed = bytearray(rows * cols)
+    open_region(board, rows, cols, revealed, first_row, first_col)
+    return frozenset(i for i in range(rows * cols) if revealed[i] and board[i // cols][i % cols] == 0)
+
+
+def build_board(rows, cols, num_mines, seed, start=None, attempts=2000):
+    """Generate boards until one needs no guessing; runs in a worker process.
+
+    Returns (board, opening cells) or None if every attempt needed a guess.
+    Without a start cell each attempt picks a random one.
+    """
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        row, col = start or (rng.randrange(rows), rng.randrange(cols))
+        board = generate_board(rows, cols, num_mines, row, col, rng)
+        if is_no_guess(board, rows, cols, num_mines, row, col):
+            return board, opening(board, rows, cols, row, col)
+    return None
+
+
+def flip_board(board, vertical, horizontal):
+    rows = board[::-1] if vertical else board
+    return [row[::-1] for row in rows] if horizontal else [list(row) for row in rows]
+
+
+class NoGuessCache:
+    """Keeps a few verified no-guess boards ready for each board size.
+
+    A background multiprocessing pool generates and verifies boards. At
+    most `size` boards per (rows, cols, mines) are ready or in progress.
+    A ready board can serve a first click anywhere in its opening, after
+    flipping it horizontally and/or vertically.
+    """
+
+    def __init__(self, size=3, processes=None):
+        self.size = size
+        self.processes = processes
+        self.pool = None
+        self.ready = {}    # (rows, cols, mines) -> deque of (board, opening)
+        self.pending = {}  # (rows, cols, mines) -> boards being generated
+        self.lock = threading.Lock()
+
+    def fill(self, rows, cols, num_mines):
+        """Start generating boards until the queue for this size is full."""
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes)
+
+        key = (rows, cols, num_mines)
+        with self.lock:
+            ready = self.ready.setdefault(key, deque())
+            missing = self.size - len(ready) - self.pending.get(key, 0)
+            self.pending[key] = self.pending.get(key, 0) + max(missing, 0)
+
+        for _ in range(missing):
+            self.pool.apply_async(
+                build_board, (rows, cols, num_mines, random.getrandbits(64)),
+                callback=lambda result, key=key: self.finished(key, result),
+                error_callback=lambda error, key=key: self.finished(key, None)
+            )
+
+    def finished(self, key, result):
+        # Runs on the pool's result thread
+        with self.lock:
+            self.pending[key] -= 1
+            if result is not None:
+                self.ready[key].append(result)
+
+    def take(self, rows, cols, num_mines, row, col):
+        """A ready board whose opening contains (row, col), or None."""
+        key = (rows, cols, num_mines)
+        board = None
+        with self.lock:
+            ready = self.ready.get(key, deque())
+            for entry in ready:
+                flips = self.fitting_flip(entry[1], rows, cols, row, col)
+                if flips is not None:
+                    ready.remove(entry)
+                    board = flip_board(entry[0], *flips)
+                    break
+
+        self.fill(rows, cols, num_mines)
+        return board
+
+    @staticmethod
+    def fitting_flip(zeros, rows, cols, row, col):
+        """(vertical, horizontal) flips that put (row, col) in the opening, or None."""
+        for vertical in (False, True):
+            for horizontal in (False, True):
+                r = rows - 1 - row if vertical else row
+                c = cols - 1 - col if horizontal else col
+                if r * cols + c in zeros:
+                    return vertical, horizontal
+        return None
+
+    def request(self, rows, cols, num_mines, row, col):
+        """Generate a board for this exact first click; returns an AsyncResult.
+
+        Hand it to keep() if the game moves on before using the board.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes)
+        return self.pool.apply_async(build_board, (rows, cols, num_mines, random.getrandbits(64), (row, col)))
+
+    def keep(self, rows, cols, num_mines, result):
+        """Queue the board of a request that was not used, once it is ready.
+
+        It is kept like a prefetched board, its opening holds the requested click.
+        """
+        key = (rows, cols, num_mines)
+        threading.Thread(target=self.keep_when_ready, args=(key, result), daemon=True).start()
+
+    def keep_when_ready(self, key, result):
+        result.wait()
+        if not result.successful() or result.get() is None:
+            return
+        with self.lock:
+            ready = self.ready.setdefault(key, deque())
+            if len(ready) < self.size:
+                ready.append(result.get())
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
@@ -0,0 +1,286 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from collections import deque
+
+from mine_field import MineField, NO_MARK, FLAG, QUESTION, pack_states, unpack_states
+from mine_generator import neighbour_counts
+
+MAGIC = b"MSWP"
+VERSION = 1
+# magic, version, rows, cols, mines, seed, elapsed seconds, flags placed, cells revealed
+HEADER = struct.Struct("<4sBIIIQdQQ")
+
+# Packed cell states, see pack_states
+HIDDEN = 0
+REVEALED = 1
+FLAGGED = FLAG + 1
+
+
+def layout(rows, cols):
+    """(mine row stride, state row stride, file size) of a save.
+
+    Every row starts on a byte boundary, one bit per cell for mines then
+    two bits per cell for states, so any rectangle of the board can be
+    read without touching the rest.
+    """
+    mine_stride = (cols + 7) // 8
+    state_stride = (cols + 3) // 4
+    return mine_stride, state_stride, HEADER.size + rows * (mine_stride + state_stride)
+
+
+def save_game(path, field, seed, elapsed):
+    """Write a MineField or MappedField to path.
+
+    The file is written next to path and moved over it, so a failed save
+    never leaves half a file behind.
+    """
+    rows, cols = field.rows, field.cols
+    header = HEADER.pack(MAGIC, VERSION, rows, cols, field.num_mines, seed, elapsed,
+                         field.flags, field.cells_revealed)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        if isinstance(field, MappedField):
+            # Already in the file format
+            file.write(field.map[HEADER.size:])
+        else:
+            mine_stride, _, _ = layout(rows, cols)
+            for line in field.board:
+                bits = sum(1 << col for col, count in enumerate(line) if count == -1)
+                file.write(bits.to_bytes(mine_stride, "little"))
+            for row in range(rows):
+                start = row * cols
+                file.write(pack_states(field.revealed[start:start + cols], field.marks[start:start + cols]))
+    os.replace(temp_path, path)
+
+
+def load_game(path):
+    """Open a save as a MappedField; raises ValueError for a bad file."""
+    return MappedField(path)
+
+
+class MappedField:
+    """A saved game played in place through a copy-on-write memory map.
+
+    Nothing is decoded when the file is opened: cells are read from the
+    mine and state bits as they are asked for, so a 10,000 x 10,000 board
+    opens as fast as a small one and drawing the view only decodes the
+    cells in it. Moves change the mapped copy, never the file, until the
+    game is saved. Has the same cell API as MineField.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("not a Minesweeper save")
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        (magic, version, self.rows, self.cols, self.num_mines, self.seed, self.elapsed,
+         self.flags, self.cells_revealed) = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("not a Minesweeper save")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"unsupported save version {version}")
+
+        self.mine_stride, self.state_stride, expected = layout(self.rows, self.cols)
+        if size != expected:
+            self.close()
+            raise ValueError("save file is truncated or corrupt")
+        self.state_offset = HEADER.size + self.rows * self.mine_stride
+
+    def close(self):
+        self.map.close()
+
+    @property
+    def mines_left(self):
+        return self.num_mines - self.flags
+
+    @property
+    def cleared(self):
+        return self.cells_revealed == self.rows * self.cols - self.num_mines
+
+    def state(self, row, col):
+        byte = self.map[self.state_offset + row * self.state_stride + (col >> 2)]
+        return (byte >> ((col & 3) << 1)) & 3
+
+    def set_state(self, row, col, state):
+        i = self.state_offset + row * self.state_stride + (col >> 2)
+        shift = (col & 3) << 1
+        self.map[i] = (self.map[i] & ~(3 << shift)) | (state << shift)
+
+    def is_revealed(self, row, col):
+        return self.state(row, col) == REVEALED
+
+    def mark(self, row, col):
+        state = self.state(row, col)
+        return state - 1 if state > REVEALED else NO_MARK
+
+    def is_mine(self, row, col):
+        byte = self.map[HEADER.size + row * self.mine_stride + (col >> 3)]
+        return (byte >> (col & 7)) & 1 == 1
+
+    def count(self, row, col):
+        """-1 for a mine, else the number of mines around the cell."""
+        if self.is_mine(row, col):
+            return -1
+        return sum(self.is_mine(r, c)
+                   for r in range(max(row - 1, 0), min(row + 2, self.rows))
+                   for c in range(max(col - 1, 0), min(col + 2, self.cols)))
+
+    def cycle_mark(self, row, col, question_marks=True):
+        """Move a hidden cell to its next mark and return it, None if revealed."""
+        state = self.state(row, col)
+        if state == REVEALED:
+            return None
+
+        mark = state - 1 if state else NO_MARK
+        if mark == NO_MARK:
+            new = FLAG
+        elif mark == FLAG and question_marks:
+            new = QUESTION
+        else:
+            new = NO_MARK
+
+        self.flags += (new == FLAG) - (mark == FLAG)
+        self.set_state(row, col, new + 1 if new else HIDDEN)
+        return new
+
+    def open_cell(self, row, col):
+        """Reveal one cell if it is hidden and unflagged; returns its count or None."""
+        state = self.state(row, col)
+        if state == REVEALED or state == FLAGGED:
+            return None
+        self.set_state(row, col, REVEALED)
+        return self.count(row, col)
+
+    def flood(self, row, col):
+        """Reveal and return the cells a click on (row, col) opens, as MineField.flood."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+        count = self.open_cell(row, col)
+        if count is None:
+            return []
+
+        region = [(row, col)]
+        queue = deque([(row, col, count)])
+        while queue:
+            r, c, count = queue.popleft()
+            if count != 0:
+                continue
+            for nr in range(max(r - 1, 0), min(r + 2, self.rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, self.cols)):
+                    count = self.open_cell(nr, nc)
+                    if count is not None:
+                        region.append((nr, nc))
+                        queue.append((nr, nc, count))
+
+        self.cells_revealed += len(region)
+        return region
+
+    def chord_cells(self, row, col):
+        """Hidden unflagged neighbours to open by chording on (row, col)."""
+        count = self.count(row, col)
+        if count <= 0 or not self.is_revealed(row, col):
+            return []
+
+        flags = 0
+        cells = []
+        for r in range(max(row - 1, 0), min(row + 2, self.rows)):
+            for c in range(max(col - 1, 0), min(col + 2, self.cols)):
+                state = self.state(r, c)
+                if state == FLAGGED:
+                    flags += 1
+                elif state != REVEALED:
+                    cells.append((r, c))
+        return cells if flags == count else []
+
+    def to_field(self):
+        """Decode the whole board into a MineField, for boards small enough to show at once."""
+        rows, cols = self.rows, self.cols
+        mines = []
+        for row in range(rows):
+            start = HEADER.size + row * self.mine_stride
+            bits = int.from_bytes(self.map[start:start + self.mine_stride], "little")
+            while bits:
+                low = bits & -bits
+                mines.append(row * cols + low.bit_length() - 1)
+                bits ^= low
+
+        field = MineField(rows, cols, self.num_mines)
+        field.board = neighbour_counts(rows, cols, mines)
+        for row in range(rows):
+            start = self.state_offset + row * self.state_stride
+            revealed, marks = unpack_states(self.map[start:start + self.state_stride], cols)
+            field.revealed[row * cols:(row + 1) * cols] = revealed
+            field.marks[row * cols:(row + 1) * cols] = marks
+        field.flags = self.flags
+        field.cells_revealed = self.cells_revealed
+        return field
+
+
+def write_random_save(path, rows, cols, seed):
+    """A big save written straight in the file format, mines only."""
+    rng = random.Random(seed)
+    mine_stride, state_stride, _ = layout(rows, cols)
+    mines = 0
+    with open(path + ".tmp", "wb") as file:
+        file.seek(HEADER.size)
+        for _ in range(rows):
+            # One mine in eight cells
+            bits = rng.getrandbits(cols) & rng.getrandbits(cols) & rng.getrandbits(cols)
+            mines += bits.bit_count()
+            file.write(bits.to_bytes(mine_stride, "little"))
+        file.write(bytes(rows * state_stride))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, rows, cols, mines, seed, 0.0, 0, 0))
+    os.replace(path + ".tmp", path)
+
+
+def benchmark(path, size, view_rows, view_cols):
+    """Time opening a size x size save and decoding one view of it."""
+    begin = time.perf_counter()
+    write_random_save(path, size, size, 0)
+    written = time.perf_counter() - begin
+    print(f"wrote {size}x{size} save, {os.path.getsize(path) / 1e6:.1f} MB in {written:.2f}s")
+
+    begin = time.perf_counter()
+    mapped = load_game(path)
+    opened = time.perf_counter() - begin
+
+    top, left = size // 2, size // 2
+    begin = time.perf_counter()
+    for row in range(top, top + view_rows):
+        for col in range(left, left + view_cols):
+            mapped.is_revealed(row, col)
+            mapped.mark(row, col)
+            mapped.count(row, col)
+    decoded = time.perf_counter() - begin
+    mapped.close()
+
+    print(f"open {opened * 1000:.2f} ms, decode a {view_rows}x{view_cols} view {decoded * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark opening a big Minesweeper save")
+    parser.add_argument("--path", default="minesweeper-benchmark.msw", help="scratch file, removed afterwards")
+    parser.add_argument("--size", type=int, default=10000, help="the board is SIZE x SIZE")
+    parser.add_argument("--view", default="20x30", metavar="ROWSxCOLS", help="view decoded after opening")
+    args = parser.parse_args()
+
+    try:
+        view_rows, view_cols = (int(n) for n in args.view.split("x"))
+        benchmark(args.path, args.size, view_rows, view_cols)
+    finally:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import math
+
+
+class Analysis:
+    """What the solver knows about the hidden cells of a position.
+
+    safe and mines hold (row, col) cells that are certain. probabilities
+    maps frontier cells (hidden cells next to a revealed number) to their
+    exact mine probability; every other hidden cell has
+    interior_probability.
+    """
+
+    def __init__(self, safe, mines, probabilities, interior_probability, approximate=False):
+        self.safe = safe
+        self.mines = mines
+        self.probabilities = probabilities
+        self.interior_probability = interior_probability
+        self.approximate = approximate  # a component was too big to enumerate
+
+    def probability(self, row, col):
+        cell = (row, col)
+        if cell in self.safe:
+            return 0.0
+        if cell in self.mines:
+            return 1.0
+        return self.probabilities.get(cell, self.interior_probability)
+
+    def best_guess(self):
+        """Hidden frontier cell least likely to be a mine, or None."""
+        if not self.probabilities:
+            return None
+        return min(self.probabilities, key=self.probabilities.get)
+
+
+class MineSolver:
+    """Constraint solver for a Minesweeper position.
+
+    Works on the game's model: a flat revealed bytearray and the board
+    rows (only revealed cells' counts are read). Flags are player guesses
+    and are ignored.
+
+    Certain cells come from the single-cell and subset rules. What's left
+    of the frontier is split into independent components that are
+    enumerated separately and combined with the global mine count for
+    exact probabilities. Component results are cached by their
+    constraints, so after a click only the components it changed are
+    enumerated again.
+    """
+
+    def __init__(self, rows, cols, num_mines, max_component=40):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.max_component = max_component  # bigger components get a density estimate
+        self.cache = {}
+
+    def neighbours(self, i):
+        row, col = divmod(i, self.cols)
+        for r in range(max(row - 1, 0), min(row + 2, self.rows)):
+            for c in range(max(col - 1, 0), min(col + 2, self.cols)):
+                if r != row or c != col:
+                    yield r * self.cols + c
+
+    def solve(self, revealed, board):
+        """Analyse the position and return an Analysis."""
+        cols = self.cols
+        constraints = []
+        for i, is_revealed in enumerate(revealed):
+            if not is_revealed:
+                continue
+            count = board[i // cols][i % cols]
+            if count <= 0:
+                continue
+            hidden = frozenset(n for n in self.neighbours(i) if not revealed[n])
+            if hidden:
+                constraints.append((hidden, count))
+
+        safe, mines, constraints = self.apply_rules(constraints)
+
+        # Independent components of the remaining frontier
+        components = self.split(constraints)
+        results = {}
+        approximate = False
+        for component in components:
+            key = frozenset(component)
+            result = self.cache.get(key)
+            if result is None:
+                result = self.enumerate(component)
+            results[key] = result
+            approximate = approximate or result is None
+
+        # Only keep what the current position can reuse
+        self.cache = {key: result for key, result in results.items() if result is not None}
+
+        # Cells of components too big to enumerate count as interior cells
+        frontier = set()
+        for key, result in results.items():
+            if result is not None:
+                for cells, _ in key:
+                    frontier |= cells
+        hidden_total = len(revealed) - sum(revealed)
+        interior = hidden_total - len(frontier) - len(safe) - len(mines)
+        remaining = self.num_mines - len(mines)
+
+        probabilities, interior_probability = self.combine(
+            list(results.items()), interior, remaining
+        )
+
+        # Enumeration can prove more cells certain
+        for cell, p in list(probabilities.items()):
+            if p == 0.0:
+                safe.add(cell)
+                del probabilities[cell]
+            elif p == 1.0:
+                mines.add(cell)
+                del probabilities[cell]
+
+        def as_cells(indices):
+            return {divmod(i, cols) for i in indices}
+
+        return Analysis(
+            as_cells(safe), as_cells(mines),
+            {divmod(i, cols): p for i, p in probabilities.items()},
+            interior_probability, approximate
+        )
+
+    @staticmethod
+    def apply_rules(constraints):
+        """Single-cell and subset deductions until nothing changes.
+
+        Returns (safe, mines, remaining constraints) with known cells
+        removed from the constraints.
+        """
+        safe = set()
+        mines = set()
+        changed = True
+        while changed:
+            changed = False
+
+            # Drop known cells and duplicates
+            reduced = set()
+            for cells, count in constraints:
+                count -= len(cells & mines)
+                cells = cells - mines - safe
+                if cells:
+                    reduced.add((cells, count))
+            constraints = list(reduced)
+
+            for cells, count in constraints:
+                if count == 0:
+                    safe |= cells
+                    changed = True
+                elif count == len(cells):
+                    mines |= cells
+                    changed = True
+            if changed:
+                continue
+
+            # Subset rule: if A is inside B, B - A holds count(B) - count(A) mines
+            by_cell = {}
+            for constraint in constraints:
+                for cell in constraint[0]:
+                    by_cell.setdefault(cell, []).append(constraint)
+
+            for cells, count in constraints:
+                others = {other for cell in cells for other in by_cell[cell]}
+                for other_cells, other_count in others:
+                    if not cells < other_cells:
+                        continue
+                    rest = other_cells - cells
+                    rest_count = other_count - count
+                    if rest_count == 0:
+                        safe |= rest
+                        changed = True
+                    elif rest_count == len(rest):
+                        mines |= rest
+                        changed = True
+                if changed:
+                    break
+
+        return safe, mines, constraints
+
+    @staticmethod
+    def split(constraints):
+        """Group constraints that share cells into independent components."""
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in constraints:
+            first = None
+            for cell in cells:
+                parent.setdefault(cell, cell)
+                if first is None:
+                    first = find(cell)
+                else:
+                    parent[find(cell)] = first
+
+        groups = {}
+        for constraint in constraints:
+            root = find(next(iter(constraint[0])))
+            groups.setdefault(root, []).append(constraint)
+        return list(groups.values())
+
+    def enumerate(self, component):
+        """Count the solutions of one component by backtracking.
+
+        Returns {mines: (solutions, {cell: solutions with a mine there})},
+        or None when the component has more than max_component cells.
+        """
+        # Order cells constraint by constraint so constraints complete early and prune
+        cells = []
+        seen = set()
+        for constraint_cells, _ in sorted(component, key=lambda constraint: min(constraint[0])):
+            for cell in sorted(constraint_cells - seen):
+                seen.add(cell)
+                cells.append(cell)
+        if len(cells) > self.max_component:
+            return None
+
+        position = {cell: i for i, cell in enumerate(cells)}
+        constraints = [([position[c] for c in constraint_cells], count) for constraint_cells, count in component]
+        # Constraints each cell takes part in, checked after assigning it
+        watching = [[] for _ in cells]
+        for k, (members, _) in enumerate(constraints):
+            for member in members:
+                watching[member].append(k)
+
+        mine_sum = [0] * len(constraints)
+        free = [len(members) for members, _ in constraints]
+        assignment = [0] * len(cells)
+        results = {}
+
+        def place(i, mines):
+            if i == len(cells):
+                total, per_cell = results.get(mines, (0, [0] * len(cells)))
+                for j, value in enumerate(assignment):
+                    per_cell[j] += value
+                results[mines] = (total + 1, per_cell)
+                return
+
+            for value in (0, 1):
+                ok = True
+                for k in watching[i]:
+                    mine_sum[k] += value
+                    free[k] -= 1
+                for k in watching[i]:
+                    need = constraints[k][1] - mine_sum[k]
+                    if need < 0 or need > free[k]:
+                        ok = False
+                        break
+                if ok:
+                    assignment[i] = value
+                    place(i + 1, mines + value)
+                for k in watching[i]:
+                    mine_sum[k] -= value
+                    free[k] += 1
+            assignment[i] = 0
+
+        place(0, 0)
+        return {
+            mines: (total, dict(zip(cells, per_cell)))
+            for mines, (total, per_cell) in results.items()
+        }
+
+    @staticmethod
+    def combine(components, interior, remaining):
+        """Mix component solutions with the global mine count.
+
+        A total of K frontier mines leaves remaining - K mines for the
+        interior cells, so each combination is weighted by C(interior,
+        remaining - K). Returns (frontier probabilities, interior
+        probability).
+        """
+        def log_weight(frontier_mines):
+            left = remaining - frontier_mines
+            if left < 0 or left > interior:
+                return None
+            return math.lgamma(interior + 1) - math.lgamma(left + 1) - math.lgamma(interior - left + 1)
+
+        exact = [(key, result) for key, result in components if result is not None]
+        estimated = [key for key, result in components if result is None]
+
+        # distributions[c][k] = number of solutions of component c with k mines
+        distributions = [{k: total for k, (total, _) in result.items()} for _, result in exact]
+
+        def convolve(a, b):
+            out = {}
+            for ka, va in a.items():
+                for kb, vb in b.items():
+                    out[ka + kb] = out.get(ka + kb, 0) + va * vb
+            return out
+
+        prefix = [{0: 1}]
+        for distribution in distributions:
+            prefix.append(convolve(prefix[-1], distribution))
+        suffix = [{0: 1}]
+        for distribution in reversed(distributions):
+            suffix.append(convolve(suffix[-1], distribution))
+        suffix.reverse()
+        totals = prefix[-1]
+
+        logs = {k: log_weight(k) for k in range(remaining + 1)}
+        valid = [value for value in logs.values() if value is not None]
+        if not valid or not totals:
+            return {}, 0.0
+        top = max(valid)
+        weight = {k: math.exp(value - top) for k, value in logs.items() if value is not None}
+
+        norm = sum(count * weight.get(k, 0.0) for k, count in totals.items())
+        if norm == 0:
+            return {}, 0.0
+
+        probabilities = {}
+        for c, (_, result) in enumerate(exact):
+            others = convolve(prefix[c], suffix[c + 1])
+            for k, (_, per_cell) in result.items():
+                factor = sum(count * weight.get(k + other, 0.0) for other, count in others.items())
+                if not factor:
+                    continue
+                for cell, hits in per_cell.items():
+                    probabilities[cell] = probabilities.get(cell, 0.0) + hits * factor
+
+        for cell in probabilities:
+            p = probabilities[cell] / norm
+            probabilities[cell] = 0.0 if p < 1e-12 else 1.0 if p > 1 - 1e-12 else p
+        # Cells that no solution puts a mine on
+        for _, result in exact:
+            for _, (_, per_cell) in result.items():
+                for cell in per_cell:
+                    probabilities.setdefault(cell, 0.0)
+
+        expected_interior = sum(count * weight.get(k, 0.0) * (remaining - k)
+                                for k, count in totals.items()) / norm
+        interior_probability = expected_interior / interior if interior else 0.0
+
+        # Components too big to enumerate share the interior density
+        for component in estimated:
+            for cells, _ in component:
+                for cell in cells:
+                    probabilities.setdefault(cell, interior_probability)
+
+        return probabilities, interior_probability
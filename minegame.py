@@ -1,6 +1,187 @@
-import tkinter as tk
-from tkinter import messagebox
 import random
+import time
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog
+
+from mine_endless import EndlessWorld
+from mine_field import MineField, FLAG, QUESTION
+from mine_generator import generate_board
+from mine_solver import MineSolver
+from mine_pregen import NoGuessCache
+from mine_save import MappedField, load_game, save_game
+
+# Endless mode shows this many cells and moves the view this far per arrow key
+ENDLESS_ROWS = 20
+ENDLESS_COLS = 30
+PAN_STEP = 5
+
+SAVE_TYPES = [("Minesweeper saves", "*.msw"), ("All files", "*.*")]
+
+
+class CanvasBoard:
+    """Draws the minefield on a single canvas.
+
+    Hidden cells are one background rectangle under a set of grid lines,
+    so an untouched board costs rows + cols items whatever its size. A cell
+    gets its own rectangle and text only once it changes, and clicks are
+    mapped to cells arithmetically.
+
+    Cells are addressed in board coordinates; (top, left) is the cell in
+    the top-left corner, which only moves in Endless mode. Cells outside
+    the view are not drawn.
+    """
+
+    HIDDEN_BG = "#d3d3d3"
+    GRID_COLOR = "#808080"
+    FONT = ("Arial", 10, "bold")
+    OVERLAY_FONT = ("Arial", 7)
+
+    def __init__(self, master, cell_size, on_left_click, on_right_click, on_middle_click=None):
+        self.cell_size = cell_size
+        self.rows = 0
+        self.cols = 0
+        self.top = 0
+        self.left = 0
+        self.items = {}  # (row, col) -> (rectangle, text) for cells that were drawn
+
+        self.frame = tk.Frame(master, bd=2, relief=tk.SUNKEN)
+        self.canvas = tk.Canvas(self.frame, bg=self.HIDDEN_BG, highlightthickness=0)
+        self.h_scroll = tk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.v_scroll = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(xscrollcommand=self.h_scroll.set, yscrollcommand=self.v_scroll.set)
+        self.canvas.grid(row=0, column=0)
+
+        self.canvas.bind("<Button-1>", lambda event: self.on_click(event, on_left_click))
+        self.canvas.bind("<Button-3>", lambda event: self.on_click(event, on_right_click))
+        if on_middle_click is not None:
+            self.canvas.bind("<Button-2>", lambda event: self.on_click(event, on_middle_click))
+        self.canvas.bind("<MouseWheel>", lambda event: self.canvas.yview_scroll(-event.delta // 120, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def resize(self, rows, cols, max_width, max_height):
+        """Start a fresh board of the given size, scrolling if it doesn't fit."""
+        self.rows = rows
+        self.cols = cols
+        self.top = 0
+        self.left = 0
+        self.items.clear()
+        self.canvas.delete("all")
+
+        size = self.cell_size
+        width = cols * size
+        height = rows * size
+        self.canvas.create_rectangle(0, 0, width, height, fill=self.HIDDEN_BG, outline="")
+        for col in range(cols + 1):
+            self.canvas.create_line(col * size, 0, col * size, height, fill=self.GRID_COLOR)
+        for row in range(rows + 1):
+            self.canvas.create_line(0, row * size, width, row * size, fill=self.GRID_COLOR)
+
+        view_width = min(width, max_width)
+        view_height = min(height, max_height)
+        self.canvas.config(width=view_width, height=view_height, scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+
+        if width > view_width:
+            self.h_scroll.grid(row=1, column=0, sticky="ew")
+        else:
+            self.h_scroll.grid_remove()
+        if height > view_height:
+            self.v_scroll.grid(row=0, column=1, sticky="ns")
+        else:
+            self.v_scroll.grid_remove()
+
+    def clear(self):
+        """Hide every drawn cell again, keeping the board size."""
+        self.canvas.delete("cell", "overlay", "hint")
+        self.items.clear()
+
+    def scroll_to(self, top, left):
+        """Show the cells from (top, left) on, all hidden until drawn again."""
+        self.top = top
+        self.left = left
+        self.clear()
+
+    def visible(self, row, col):
+        return 0 <= row - self.top < self.rows and 0 <= col - self.left < self.cols
+
+    def corner(self, row, col):
+        """Canvas position of a cell's top-left corner."""
+        return (col - self.left) * self.cell_size, (row - self.top) * self.cell_size
+
+    def on_click(self, event, callback):
+        col = int(self.canvas.canvasx(event.x) // self.cell_size)
+        row = int(self.canvas.canvasy(event.y) // self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            callback(row + self.top, col + self.left)
+
+    def draw_cell(self, row, col, text="", fg="black", bg=None):
+        """Show text on a cell; bg None keeps the hidden background."""
+        if not self.visible(row, col):
+            return
+        fill = bg or self.HIDDEN_BG
+        items = self.items.get((row, col))
+        if items is None:
+            size = self.cell_size
+            x, y = self.corner(row, col)
+            rect = self.canvas.create_rectangle(x, y, x + size, y + size, fill=fill,
+                                                outline=self.GRID_COLOR, tags="cell")
+            # Empty revealed cells, most of a big opening, need no text item
+            label = None
+            if text:
+                label = self.canvas.create_text(x + size / 2, y + size / 2, text=text, fill=fg,
+                                                font=self.FONT, tags="cell")
+            self.items[(row, col)] = (rect, label)
+        else:
+            rect, label = items
+            self.canvas.itemconfig(rect, fill=fill)
+            if label is not None:
+                self.canvas.itemconfig(label, text=text, fill=fg)
+            elif text:
+                size = self.cell_size
+                x, y = self.corner(row, col)
+                label = self.canvas.create_text(x + size / 2, y + size / 2, text=text,
+                                                fill=fg, font=self.FONT, tags="cell")
+                self.items[(row, col)] = (rect, label)
+
+    def draw_cells(self, cells):
+        """Draw many cells in one go, cells are (row, col, text, fg, bg) tuples."""
+        for row, col, text, fg, bg in cells:
+            self.draw_cell(row, col, text, fg, bg)
+
+    def show_overlay(self, labels):
+        """Replace the small overlay texts, labels are (row, col, text, color) tuples."""
+        self.canvas.delete("overlay")
+        size = self.cell_size
+        for row, col, text, color in labels:
+            x, y = self.corner(row, col)
+            self.canvas.create_text(x + size - 2, y + size - 1, text=text, fill=color,
+                                    font=self.OVERLAY_FONT, anchor="se", tags="overlay")
+
+    def mark_cell(self, row, col, color):
+        """Outline one cell, replacing the previous mark."""
+        self.canvas.delete("hint")
+        size = self.cell_size
+        x, y = self.corner(row, col)
+        self.canvas.create_rectangle(x + 2, y + 2, x + size - 2, y + size - 2, outline=color,
+                                     width=3, tags="hint")
+
+    def clear_overlay(self):
+        self.canvas.delete("overlay", "hint")
+
+    def raise_overlay(self):
+        self.canvas.tag_raise("overlay")
+        self.canvas.tag_raise("hint")
+
+    def hide_cell(self, row, col):
+        """Return a cell to the plain hidden look."""
+        items = self.items.pop((row, col), None)
+        if items:
+            self.canvas.delete(*(item for item in items if item is not None))
 
 
 class Minesweeper:
@@ -30,7 +211,20 @@ class Minesweeper:
         # Game state
         self.is_game_over = False
         self.is_first_click = True
-        self.cells_revealed = 0
+        self.endless = False
+        self.panned = False  # the view shows part of the board and moves with the arrow keys
+        self.seed = 0
+        self.start_time = None  # monotonic time of the first click
+        self.elapsed_before = 0.0  # play time carried over from a saved game
+        # (rows, cols, mines, endless, panned) played before loading a save too big to decode,
+        # new games go back to it rather than build a board that size in memory
+        self.before_load = None
+
+        # No-guess boards come from a background pool, started on first use
+        self.no_guess_cache = None
+        self.pending_board = None  # (AsyncResult, row, col, board size) while a first click waits for a board
+
+        self.field = None
 
         # Create the game UI
         self.create_menu()
@@ -46,6 +240,14 @@ class Minesweeper:
         menu_bar.add_cascade(label="Game", menu=game_menu)
 
         game_menu.add_command(label="New Game", command=self.reset_game)
+        game_menu.add_command(label="Save Game...", accelerator="Ctrl+S", command=self.save)
+        game_menu.add_command(label="Load Game...", accelerator="Ctrl+O", command=self.load)
+        game_menu.add_command(label="Hint", accelerator="H", command=self.hint)
+        self.show_probabilities = tk.BooleanVar(self.root, value=False)
+        game_menu.add_checkbutton(label="Show Probabilities", accelerator="P", variable=self.show_probabilities,
+                                  command=self.refresh_overlay)
+        self.question_marks = tk.BooleanVar(self.root, value=True)
+        game_menu.add_checkbutton(label="Question Marks (?)", variable=self.question_marks)
         game_menu.add_separator()
 
         difficulty_menu = tk.Menu(game_menu, tearoff=0)
@@ -55,10 +257,24 @@ class Minesweeper:
         difficulty_menu.add_command(label="Intermediate (16x16, 40 mines)",
                                     command=lambda: self.set_difficulty(16, 16, 40))
         difficulty_menu.add_command(label="Expert (16x30, 99 mines)", command=lambda: self.set_difficulty(16, 30, 99))
+        difficulty_menu.add_command(label="Custom...", command=self.custom_difficulty)
+        difficulty_menu.add_command(label="Endless", command=self.start_endless)
+        difficulty_menu.add_separator()
+        self.no_guess = tk.BooleanVar(self.root, value=False)
+        difficulty_menu.add_checkbutton(label="No Guessing", variable=self.no_guess, command=self.toggle_no_guess)
 
         game_menu.add_separator()
         game_menu.add_command(label="Exit", command=self.root.quit)
 
+        self.root.bind("<h>", lambda event: self.hint())
+        self.root.bind("<p>", lambda event: self.toggle_probabilities())
+        self.root.bind("<Control-s>", lambda event: self.save())
+        self.root.bind("<Control-o>", lambda event: self.load())
+        self.root.bind("<Up>", lambda event: self.pan(-PAN_STEP, 0))
+        self.root.bind("<Down>", lambda event: self.pan(PAN_STEP, 0))
+        self.root.bind("<Left>", lambda event: self.pan(0, -PAN_STEP))
+        self.root.bind("<Right>", lambda event: self.pan(0, PAN_STEP))
+
     def create_status_bar(self):
         self.status_frame = tk.Frame(self.root)
         self.status_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -90,215 +306,433 @@ class Minesweeper:
         self.status_label.pack(side=tk.RIGHT)
 
     def create_grid(self):
-        # Create frame for grid
-        self.grid_frame = tk.Frame(
-            self.root,
-            bd=2,
-            relief=tk.SUNKEN
-        )
-        self.grid_frame.pack(padx=10, pady=10)
-
-        # Create buttons grid
-        self.buttons = []
-        for row in range(self.rows):
-            button_row = []
-            for col in range(self.cols):
-                button = tk.Button(
-                    self.grid_frame,
-                    width=2,
-                    height=1,
-                    font=("Arial", 10, "bold"),
-                    bg="#d3d3d3",
-                    bd=1,
-                    relief=tk.RAISED
-                )
-                button.grid(row=row, column=col)
-                button.bind("<Button-1>", lambda event, r=row, c=col: self.left_click(r, c))
-                button.bind("<Button-3>", lambda event, r=row, c=col: self.right_click(r, c))
-                button_row.append(button)
-            self.buttons.append(button_row)
-
-    def initialize_board(self):
-        # Create data structure for board
-        self.board = []
-        for row in range(self.rows):
-            self.board.append([0] * self.cols)
-
-        # Flags to track flagged cells
-        self.flags = []
-        for row in range(self.rows):
-            self.flags.append([False] * self.cols)
+        # One canvas for the whole board
+        self.board_view = CanvasBoard(self.root, self.cell_size, self.left_click, self.right_click,
+                                      self.middle_click)
+        self.board_view.pack(padx=10, pady=10)
+        self.resize_grid()
+
+    def resize_grid(self):
+        # Scroll boards that don't fit on the screen
+        max_width = self.root.winfo_screenwidth() - 80
+        max_height = self.root.winfo_screenheight() - 200
+        rows, cols = self.rows, self.cols
+        if self.panned:
+            # Show what fits, the arrow keys move the view
+            rows = min(rows, max_height // self.cell_size)
+            cols = min(cols, max_width // self.cell_size)
+        self.board_view.resize(rows, cols, max_width, max_height)
+
+    def initialize_board(self, field=None):
+        if isinstance(self.field, (EndlessWorld, MappedField)):
+            # Drop the old world's chunk store or the mapped save
+            self.field.close()
+
+        # Mines, revealed cells, marks and their counters; the UI only reads this
+        if field is not None:
+            self.field = field
+        elif self.endless:
+            self.field = EndlessWorld()
+        else:
+            self.field = MineField(self.rows, self.cols, self.num_mines)
+
+        # Solver for hints, keeps its component cache for this board
+        self.solver = MineSolver(self.rows, self.cols, self.num_mines)
 
     def set_difficulty(self, rows, cols, mines):
         self.rows = rows
         self.cols = cols
         self.num_mines = mines
+        self.endless = False
+        self.panned = False
+        self.before_load = None
+
+        self.reset_game()
 
-        # Destroy existing grid
-        for widget in self.grid_frame.winfo_children():
-            widget.destroy()
+    def start_endless(self):
+        # The board has no edges; rows and cols are the size of the view
+        self.rows = ENDLESS_ROWS
+        self.cols = ENDLESS_COLS
+        self.endless = True
+        self.panned = True
+        self.before_load = None
 
         self.reset_game()
 
+    def pan(self, rows, cols):
+        if not self.panned:
+            return
+        view = self.board_view
+        top = view.top + rows
+        left = view.left + cols
+        if not self.endless:
+            top = max(0, min(top, self.rows - view.rows))
+            left = max(0, min(left, self.cols - view.cols))
+        view.scroll_to(top, left)
+        self.draw_visible()
+
+    def draw_visible(self):
+        # Redraw the cells in view from the model after the view moved
+        view = self.board_view
+        cells = []
+        for row in range(view.top, view.top + view.rows):
+            for col in range(view.left, view.left + view.cols):
+                if self.field.is_revealed(row, col):
+                    cells.append(self.revealed_look(row, col))
+                elif self.field.mark(row, col):
+                    self.draw_mark(row, col, self.field.mark(row, col))
+                elif self.is_game_over and self.field.is_mine(row, col):
+                    cells.append((row, col, "💣", "black", None))
+        view.draw_cells(cells)
+
+    def custom_difficulty(self):
+        rows = simpledialog.askinteger("Custom", "Rows:", parent=self.root, minvalue=5, initialvalue=self.rows)
+        if rows is None:
+            return
+        cols = simpledialog.askinteger("Custom", "Columns:", parent=self.root, minvalue=5, initialvalue=self.cols)
+        if cols is None:
+            return
+        # Keep room for the mine-free area around the first click
+        mines = simpledialog.askinteger("Custom", "Mines:", parent=self.root, minvalue=1,
+                                        maxvalue=rows * cols - 9, initialvalue=min(self.num_mines, rows * cols - 9))
+        if mines is None:
+            return
+
+        self.set_difficulty(rows, cols, mines)
+
     def place_mines(self, first_row, first_col):
-        # Place mines randomly, avoiding first click
-        mines_placed = 0
-        while mines_placed < self.num_mines:
-            row = random.randint(0, self.rows - 1)
-            col = random.randint(0, self.cols - 1)
-
-            # Avoid placing mine at first click or adjacent to it
-            if abs(row - first_row) <= 1 and abs(col - first_col) <= 1:
-                continue
-
-            # Place mine if not already placed
-            if self.board[row][col] != -1:
-                self.board[row][col] = -1
-                mines_placed += 1
-
-        # Calculate numbers
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.board[row][col] == -1:
-                    continue
-
-                # Count adjacent mines
-                mine_count = 0
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        r, c = row + dr, col + dc
-                        if 0 <= r < self.rows and 0 <= c < self.cols and self.board[r][c] == -1:
-                            mine_count += 1
-
-                self.board[row][col] = mine_count
+        # Place mines randomly, avoiding first click and its neighbours
+        self.field.board = generate_board(self.rows, self.cols, self.num_mines, first_row, first_col,
+                                          random.Random(self.seed))
+
+    def toggle_no_guess(self):
+        if self.no_guess.get():
+            if self.no_guess_cache is None:
+                self.no_guess_cache = NoGuessCache()
+            # Have boards ready for every standard difficulty
+            for rows, cols, mines in ((10, 10, 15), (16, 16, 40), (16, 30, 99)):
+                self.no_guess_cache.fill(rows, cols, mines)
+        self.reset_game()
+
+    def take_no_guess_board(self, row, col):
+        # Use a ready board if one fits the first click, else generate one in the background
+        board = self.no_guess_cache.take(self.rows, self.cols, self.num_mines, row, col)
+        if board is not None:
+            self.field.board = board
+            return True
+
+        result = self.no_guess_cache.request(self.rows, self.cols, self.num_mines, row, col)
+        self.pending_board = (result, row, col, (self.rows, self.cols, self.num_mines))
+        self.status_label.config(text="Generating board...")
+        self.root.after(50, self.check_pending_board)
+        return False
+
+    def check_pending_board(self):
+        if self.pending_board is None:
+            return
+        result, row, col, _ = self.pending_board
+        if not result.ready():
+            self.root.after(50, self.check_pending_board)
+            return
+
+        self.pending_board = None
+        generated = result.get() if result.successful() else None
+        if generated is None:
+            # Too dense to find a no-guess board, play a normal one
+            self.place_mines(row, col)
+        else:
+            self.field.board = generated[0]
+        self.is_first_click = False
+        self.start_time = time.monotonic()
+        self.status_label.config(text="Game Started")
+        self.left_click(row, col)
+
+    def close(self):
+        if self.no_guess_cache is not None:
+            self.no_guess_cache.close()
+        if isinstance(self.field, (EndlessWorld, MappedField)):
+            self.field.close()
+
+    def elapsed(self):
+        if self.start_time is None:
+            return self.elapsed_before
+        return self.elapsed_before + time.monotonic() - self.start_time
+
+    def save(self):
+        if self.endless or self.is_first_click or self.is_game_over:
+            self.status_label.config(text="No game to save")
+            return
+        path = filedialog.asksaveasfilename(parent=self.root, title="Save Game", defaultextension=".msw",
+                                            filetypes=SAVE_TYPES)
+        if not path:
+            return
+        try:
+            save_game(path, self.field, self.seed, self.elapsed())
+        except OSError as error:
+            messagebox.showerror("Save Game", f"Couldn't save the game:\n{error}")
+            return
+        self.status_label.config(text="Game Saved")
+
+    def load(self):
+        path = filedialog.askopenfilename(parent=self.root, title="Load Game", filetypes=SAVE_TYPES)
+        if not path:
+            return
+        try:
+            field = load_game(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Load Game", f"Couldn't load the game:\n{error}")
+            return
+
+        before = self.before_load or (self.rows, self.cols, self.num_mines, self.endless, self.panned)
+        self.rows = field.rows
+        self.cols = field.cols
+        self.num_mines = field.num_mines
+        self.endless = False
+        # Boards that fit on screen are decoded and play as usual, bigger ones
+        # stay mapped and only the cells in view are ever read
+        size = self.cell_size
+        self.panned = (self.rows * size > self.root.winfo_screenheight() - 200
+                       or self.cols * size > self.root.winfo_screenwidth() - 80)
+        seed, elapsed = field.seed, field.elapsed
+        self.before_load = before if self.panned else None
+        if not self.panned:
+            decoded = field.to_field()
+            field.close()
+            field = decoded
+
+        self.reset_game(field)
+        self.seed = seed
+        self.elapsed_before = elapsed
+        self.is_first_click = False
+        self.start_time = time.monotonic()
+        self.status_label.config(text="Game Loaded")
+        self.draw_visible()
+        self.refresh_overlay()
 
     def left_click(self, row, col):
-        if self.is_game_over or self.flags[row][col]:
+        if self.is_game_over or self.field.mark(row, col) == FLAG:
             return
 
         if self.is_first_click:
+            if self.pending_board:
+                # Still generating the board for the first click
+                return
+            if self.no_guess.get():
+                if not self.take_no_guess_board(row, col):
+                    return
+            else:
+                self.place_mines(row, col)
             self.is_first_click = False
-            self.place_mines(row, col)
+            self.start_time = time.monotonic()
             self.status_label.config(text="Game Started")
 
-        if self.board[row][col] == -1:
-            # Hit a mine - game over
-            self.reveal_mines()
-            self.buttons[row][col].config(text="💣", bg="#ff0000")
-            self.reset_button.config(text="😵")
-            self.status_label.config(text="Game Over!")
-            self.is_game_over = True
-            messagebox.showinfo("Game Over", "You hit a mine!")
+        if self.field.is_mine(row, col):
+            self.hit_mine(row, col)
         else:
             # Reveal this cell
             self.reveal_cell(row, col)
-
-            # Check if all non-mine cells are revealed
-            if self.cells_revealed == (self.rows * self.cols) - self.num_mines:
-                self.reveal_mines(mark=True)
-                self.reset_button.config(text="😎")
-                self.status_label.config(text="You Win!")
-                self.is_game_over = True
-                messagebox.showinfo("Congratulations", "You won the game!")
+            self.check_win()
 
     def right_click(self, row, col):
         if self.is_game_over:
             return
 
-        button = self.buttons[row][col]
+        # Cycle flag -> question mark -> hidden
+        mark = self.field.cycle_mark(row, col, self.question_marks.get())
+        if mark is None:
+            return
+        self.draw_mark(row, col, mark)
+        self.update_counter()
 
-        # Toggle flag
-        if button["relief"] == tk.RAISED:
-            if self.flags[row][col]:
-                # Remove flag
-                self.flags[row][col] = False
-                button.config(text="")
-                self.mine_counter.config(text=f"Mines: {self.num_mines - sum(sum(row) for row in self.flags)}")
-            else:
-                # Add flag
-                self.flags[row][col] = True
-                button.config(text="🚩", fg="red")
-                self.mine_counter.config(text=f"Mines: {self.num_mines - sum(sum(row) for row in self.flags)}")
+        # Keep probabilities visible over the mark
+        self.board_view.raise_overlay()
 
-    def reveal_cell(self, row, col):
-        if not (0 <= row < self.rows and 0 <= col < self.cols):
+    def draw_mark(self, row, col, mark):
+        if mark == FLAG:
+            self.board_view.draw_cell(row, col, text="🚩", fg="red")
+        elif mark == QUESTION:
+            self.board_view.draw_cell(row, col, text="?")
+        else:
+            self.board_view.hide_cell(row, col)
+
+    def update_counter(self):
+        if self.endless:
+            self.mine_counter.config(text=f"Flags: {self.field.flags}")
+        else:
+            self.mine_counter.config(text=f"Mines: {self.field.mines_left}")
+
+    def middle_click(self, row, col):
+        # Chord: open the neighbours of a number whose mines are all flagged
+        if self.is_game_over or self.is_first_click:
             return
 
-        button = self.buttons[row][col]
+        cells = self.field.chord_cells(row, col)
+        if not cells:
+            return
+        for r, c in cells:
+            if self.field.is_mine(r, c):
+                # A wrong flag around the number
+                self.hit_mine(r, c)
+                return
+        for r, c in cells:
+            self.reveal_cell(r, c)
+        self.check_win()
+
+    def hit_mine(self, row, col):
+        # Hit a mine - game over
+        self.reveal_mines()
+        self.board_view.draw_cell(row, col, text="💣", bg="#ff0000")
+        self.reset_button.config(text="😵")
+        self.status_label.config(text="Game Over!")
+        self.is_game_over = True
+        self.board_view.clear_overlay()
+        messagebox.showinfo("Game Over", "You hit a mine!")
+
+    def check_win(self):
+        # Check if all non-mine cells are revealed
+        if self.field.cleared:
+            self.reveal_mines(mark=True)
+            self.mine_counter.config(text="Mines: 0")
+            self.reset_button.config(text="😎")
+            self.status_label.config(text="You Win!")
+            self.is_game_over = True
+            self.board_view.clear_overlay()
+            messagebox.showinfo("Congratulations", "You won the game!")
+        elif self.endless:
+            self.status_label.config(text=f"Score: {self.field.cells_revealed}")
+        else:
+            self.refresh_overlay()
 
-        # Skip if already revealed or flagged
-        if button["relief"] == tk.SUNKEN or self.flags[row][col]:
+    def hint(self):
+        # Point at a safe cell, or the least risky one if there is none
+        if self.is_game_over or not isinstance(self.field, MineField):
             return
+        if self.is_first_click:
+            self.status_label.config(text="First click is always safe")
+            return
+
+        analysis = self.solver.solve(self.field.revealed, self.field.board)
+        if analysis.safe:
+            row, col = min(analysis.safe)
+            self.board_view.mark_cell(row, col, "#00a000")
+            self.status_label.config(text="Safe cell")
+            return
+
+        cell = analysis.best_guess()
+        probability = analysis.probability(*cell) if cell else 1.0
+        if probability > analysis.interior_probability:
+            # An unconstrained cell is a better bet than any frontier cell
+            interior = self.interior_cell(analysis)
+            if interior is not None:
+                cell, probability = interior, analysis.interior_probability
+        if cell is None:
+            return
+        self.board_view.mark_cell(cell[0], cell[1], "#e0a000")
+        self.status_label.config(text=f"Guess: {probability:.0%} mine")
+
+    def interior_cell(self, analysis):
+        # Any hidden, unflagged cell the solver has no constraint on
+        for i, is_revealed in enumerate(self.field.revealed):
+            cell = divmod(i, self.cols)
+            if not is_revealed and cell not in analysis.probabilities \
+                    and cell not in analysis.safe and cell not in analysis.mines \
+                    and self.field.mark(*cell) != FLAG:
+                return cell
+        return None
+
+    def toggle_probabilities(self):
+        self.show_probabilities.set(not self.show_probabilities.get())
+        self.refresh_overlay()
+
+    def refresh_overlay(self):
+        # Mine probability of every frontier cell, drawn small in the corner
+        self.board_view.clear_overlay()
+        if not self.show_probabilities.get() or self.is_first_click or self.is_game_over \
+                or not isinstance(self.field, MineField):
+            return
+
+        analysis = self.solver.solve(self.field.revealed, self.field.board)
+        labels = [(row, col, "0", "#008000") for row, col in analysis.safe]
+        labels += [(row, col, "100", "#ff0000") for row, col in analysis.mines]
+        labels += [(row, col, f"{p * 100:.0f}", "#000080") for (row, col), p in analysis.probabilities.items()]
+        self.board_view.show_overlay(labels)
 
-        # Reveal the cell
-        button.config(relief=tk.SUNKEN, bg="#f0f0f0")
-        self.cells_revealed += 1
+    def reveal_cell(self, row, col):
+        # Work out the whole region first, then draw it in one batch
+        region = self.field.flood(row, col)
+
+        self.board_view.draw_cells([self.revealed_look(r, c) for r, c in region])
 
-        if self.board[row][col] > 0:
+    def revealed_look(self, row, col):
+        count = self.field.count(row, col)
+        if count > 0:
             # Show number
-            button.config(
-                text=str(self.board[row][col]),
-                fg=self.number_colors.get(self.board[row][col], "black")
-            )
-        elif self.board[row][col] == 0:
-            # Empty cell - reveal adjacent cells
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    self.reveal_cell(row + dr, col + dc)
+            return row, col, str(count), self.number_colors.get(count, "black"), "#f0f0f0"
+        return row, col, "", "black", "#f0f0f0"
 
     def reveal_mines(self, mark=False):
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.board[row][col] == -1:
+        # Only the cells in view, Endless mode draws the rest when it scrolls there
+        view = self.board_view
+        for row in range(view.top, view.top + view.rows):
+            for col in range(view.left, view.left + view.cols):
+                if self.field.is_mine(row, col):
                     if mark:
                         # Mark with flag if won
-                        self.buttons[row][col].config(text="🚩", fg="red")
+                        self.board_view.draw_cell(row, col, text="🚩", fg="red")
                     else:
                         # Show mine if lost
-                        self.buttons[row][col].config(text="💣", bg="#d3d3d3")
+                        self.board_view.draw_cell(row, col, text="💣")
+
+    def reset_game(self, field=None):
+        if field is None and self.before_load is not None:
+            # A new game after a mapped save is played at the size chosen before loading it
+            self.rows, self.cols, self.num_mines, self.endless, self.panned = self.before_load
+            self.before_load = None
 
-    def reset_game(self):
         # Reset game state
         self.is_game_over = False
         self.is_first_click = True
-        self.cells_revealed = 0
-
-        # Recreate grid if size changed
-        if len(self.buttons) != self.rows or len(self.buttons[0]) != self.cols:
-            # Destroy existing grid
-            for widget in self.grid_frame.winfo_children():
-                widget.destroy()
-
-            # Create new grid
-            self.create_grid()
-
-        # Reset buttons
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.buttons[row][col].config(
-                    text="",
-                    relief=tk.RAISED,
-                    bg="#d3d3d3"
-                )
-
-        # Initialize new board
-        self.initialize_board()
+        if self.pending_board:
+            # Nobody waits for that board any more, the cache can hand it to a later game
+            result, _, _, size = self.pending_board
+            self.no_guess_cache.keep(*size, result)
+        self.pending_board = None
+        self.seed = random.getrandbits(32)
+        self.start_time = None
+        self.elapsed_before = 0.0
+
+        # Redraw the board from scratch only if its size changed
+        if self.board_view.rows != self.rows or self.board_view.cols != self.cols:
+            self.resize_grid()
+        else:
+            self.board_view.scroll_to(0, 0)
+
+        # Initialize new board, or take a loaded one
+        self.initialize_board(field)
 
         # Reset UI elements
         self.reset_button.config(text="🙂")
-        self.mine_counter.config(text=f"Mines: {self.num_mines}")
+        self.update_counter()
         self.status_label.config(text="Game Ready")
 
-        # Update window size
-        width = self.cols * self.cell_size + 40
-        height = self.rows * self.cell_size + 100
-        self.root.geometry(f"{width}x{height}")
+        if self.endless:
+            # Start centred on the always-safe cell (0, 0) and open it
+            self.board_view.scroll_to(-(self.rows // 2), -(self.cols // 2))
+            self.is_first_click = False
+            self.reveal_cell(0, 0)
+            self.check_win()
+        elif self.no_guess.get() and field is None:
+            self.no_guess_cache.fill(self.rows, self.cols, self.num_mines)
+
+        # Let the window fit the board
+        self.root.geometry("")
 
 
 def main():
     root = tk.Tk()
     game = Minesweeper(root)
     root.mainloop()
+    game.close()
 
 
 if __name__ == "__main__":
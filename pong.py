@@ -1,10 +1,27 @@
+import argparse
+import importlib.util
+import math
 import tkinter as tk
 import random
-import time
+import socket
+
+from pong_ai import PongAI, DIFFICULTIES
+from pong_match import PongMatch, COUNTDOWN, encode_moves, decode_moves
+from pong_net import HostSession, ClientSession, open_link
+from pong_physics import PongPhysics
+from scheduler import FixedStepScheduler
+from replay import InputLog, PONG, game_path
+
+# Paddle keys: keysym -> (player, direction)
+PADDLE_KEYS = {
+    "w": (0, -1), "W": (0, -1), "s": (0, 1), "S": (0, 1),
+    "Up": (1, -1), "Down": (1, 1),
+}
 
 
 class PongGame:
-    def __init__(self, root):
+    def __init__(self, root, seed=None, replay=None, record_path=None, serve_delay_ms=1000,
+                 cpu=(), difficulty="medium", link=None, client=False, chaos=0):
         self.root = root
         self.root.title("Pong Game")
         self.root.resizable(False, False)
@@ -15,24 +32,62 @@ class PongGame:
         self.PADDLE_WIDTH = 15
         self.PADDLE_HEIGHT = 80
         self.BALL_SIZE = 15
-        self.PADDLE_SPEED = 10
+        self.PADDLE_SPEED = 5  # pixels per frame while a key is held
         self.BALL_SPEED_X = 5
         self.BALL_SPEED_Y = 5
         self.INITIAL_BALL_SPEED = 5
         self.MAX_BALL_SPEED = 15
         self.ACCELERATION_FACTOR = 0.1
+        self.FRAME_MS = 1000 / 60  # fixed simulation step, ~60 FPS
+        self.CHAOS_BALL_SIZE = 8
 
-        # Game variables
-        self.player1_score = 0
-        self.player2_score = 0
-        self.game_over = False
+        # Game variables, the scores live in the match
         self.paused = False
 
+        # Every game gets its own seed drawn from the session seed
+        self.seeds = random.Random(seed)
+        self.replay = replay
+        self.record_path = record_path  # each game is saved to its own numbered file, see game_path
+        self.games = 0
+
+        # Countdown before each serve, in simulation ticks so replays see the same timing
+        if replay:
+            self.serve_ticks = replay.serve_ticks
+        else:
+            self.serve_ticks = round(serve_delay_ms / self.FRAME_MS)
+        self.countdown_shown = None  # seconds on the countdown overlay, None while it is hidden
+        self.held = set()  # (player, direction) of the paddle keys held down
+        self.cpu = tuple(cpu)  # players (0 or 1) controlled by the computer
+        self.difficulty = difficulty
+        self.chaos = chaos  # number of balls in chaos mode, 0 for the normal game
+        self.start_log()
+
+        # Ball and paddles live in the model, the canvas only shows them
+        self.physics = PongPhysics(
+            self.WIDTH, self.HEIGHT, self.PADDLE_WIDTH, self.PADDLE_HEIGHT, self.BALL_SIZE,
+            initial_speed=self.INITIAL_BALL_SPEED, max_speed=self.MAX_BALL_SPEED,
+            acceleration=self.ACCELERATION_FACTOR
+        )
+
+        # Network play: the host runs the match with paddle 2 steered by the client,
+        # the client only shows the host's game
+        self.link = link
+        self.host = self.client = None
+        if link is not None:
+            if client:
+                self.client = ClientSession(link, self.physics, self.PADDLE_SPEED)
+            else:
+                self.host = HostSession(link)
+        self.remote_move = 0
+
         # Create game canvas
         self.canvas = tk.Canvas(root, width=self.WIDTH, height=self.HEIGHT, bg="black")
         self.canvas.pack()
 
-        # Initialize paddles and ball
+        # The scene is built once, back to front: court, paddles and ball, scores, overlays.
+        # New games only move the dynamic objects and hide the overlays.
+        self.new_match()
+        self.draw_center_line()
         self.init_game_objects()
 
         # Create score displays
@@ -46,253 +101,357 @@ class PongGame:
             fill="white", font=("Arial", 16)
         )
 
-        # Create center line
-        self.draw_center_line()
+        self.create_overlays()
 
         # Set up key bindings
         self.key_bindings()
 
         # Start game loop
-        self.game_loop()
+        self.scheduler = FixedStepScheduler(self.root, self.FRAME_MS, self.game_loop, self.render)
+        self.scheduler.start()
+
+    def start_log(self):
+        """Seed a new game and start recording its inputs.
+
+        Each tick's paddle moves are stored as one byte, see encode_moves.
+        """
+        if self.replay:
+            self.replay_tick = 0
+            seed = self.replay.seed
+        else:
+            seed = self.seeds.getrandbits(64)
+        self.games += 1
+        self.rng = random.Random(seed)
+        self.log = InputLog(PONG, seed, serve_ticks=self.serve_ticks)
+
+        # CPU players get their own generator so they don't shift the game's random draws;
+        # a replay doesn't need them, their moves are in the log
+        self.ai = {}
+        if not self.replay:
+            for player in self.cpu:
+                self.ai[player] = PongAI(player, self.difficulty, random.Random(f"{seed}:{player}"),
+                                         dead_zone=self.PADDLE_SPEED)
+
+    def save_log(self):
+        """Write the current game's replay if recording was requested."""
+        if self.record_path and len(self.log):
+            self.log.save(game_path(self.record_path, self.games))
+
+    def close(self):
+        """Save the replay, hang up and close the window."""
+        self.save_log()
+        if self.link is not None:
+            self.link.close()
+        self.root.destroy()
+
+    @property
+    def player1_score(self):
+        return self.match.scores[0]
+
+    @property
+    def player2_score(self):
+        return self.match.scores[1]
+
+    @property
+    def game_over(self):
+        return self.match.game_over
+
+    def new_match(self):
+        """Start the match of a new game"""
+        if self.chaos:
+            # Only chaos mode needs NumPy, the normal game runs without it
+            from pong_chaos import ChaosPhysics, ChaosMatch
+
+            # Every game scatters a new set of balls from its seed
+            self.physics = ChaosPhysics(
+                self.chaos, self.WIDTH, self.HEIGHT, self.PADDLE_WIDTH, self.PADDLE_HEIGHT, self.CHAOS_BALL_SIZE,
+                initial_speed=self.INITIAL_BALL_SPEED, max_speed=self.MAX_BALL_SPEED,
+                acceleration=self.ACCELERATION_FACTOR, seed=self.rng.getrandbits(64)
+            )
+            self.match = ChaosMatch(self.physics, self.PADDLE_SPEED)
+            return
+
+        physics = self.physics
+        if self.client:
+            # The client mirrors the host's match, the ball waits in the centre until it hears from it
+            self.match = self.client
+            physics.reset_ball(self.rng)
+        else:
+            self.match = PongMatch(physics, self.rng, self.serve_ticks, self.PADDLE_SPEED)
 
     def init_game_objects(self):
         """Initialize paddle and ball objects"""
+        physics = self.physics
+
         # Player 1 paddle (left)
-        self.paddle1_y = self.HEIGHT / 2 - self.PADDLE_HEIGHT / 2
+        paddle1_y = physics.paddle_y[0]
         self.paddle1 = self.canvas.create_rectangle(
-            10, self.paddle1_y,
-            10 + self.PADDLE_WIDTH, self.paddle1_y + self.PADDLE_HEIGHT,
+            10, paddle1_y,
+            10 + self.PADDLE_WIDTH, paddle1_y + self.PADDLE_HEIGHT,
             fill="white"
         )
 
         # Player 2 paddle (right)
-        self.paddle2_y = self.HEIGHT / 2 - self.PADDLE_HEIGHT / 2
+        paddle2_y = physics.paddle_y[1]
         self.paddle2 = self.canvas.create_rectangle(
-            self.WIDTH - 10 - self.PADDLE_WIDTH, self.paddle2_y,
-            self.WIDTH - 10, self.paddle2_y + self.PADDLE_HEIGHT,
+            self.WIDTH - 10 - self.PADDLE_WIDTH, paddle2_y,
+            self.WIDTH - 10, paddle2_y + self.PADDLE_HEIGHT,
             fill="white"
         )
 
+        # What the canvas shows, so render() only touches items that moved
+        if self.chaos:
+            # Every game has the same number of balls, the items are reused
+            size = physics.ball_size
+            self.balls = [
+                self.canvas.create_oval(x, y, x + size, y + size, fill="white")
+                for x, y in zip(physics.x.tolist(), physics.y.tolist())
+            ]
+            self.drawn = (None, None, paddle1_y, paddle2_y)
+            return
+
         # Ball
-        self.ball_x = self.WIDTH / 2 - self.BALL_SIZE / 2
-        self.ball_y = self.HEIGHT / 2 - self.BALL_SIZE / 2
         self.ball = self.canvas.create_oval(
-            self.ball_x, self.ball_y,
-            self.ball_x + self.BALL_SIZE, self.ball_y + self.BALL_SIZE,
+            physics.ball_x, physics.ball_y,
+            physics.ball_x + self.BALL_SIZE, physics.ball_y + self.BALL_SIZE,
             fill="white"
         )
-
-        # Initial ball direction (random)
-        self.ball_dx = self.INITIAL_BALL_SPEED * random.choice([-1, 1])
-        self.ball_dy = self.INITIAL_BALL_SPEED * random.choice([-0.8, 0.8])
+        self.drawn = (physics.ball_x, physics.ball_y, paddle1_y, paddle2_y)
 
     def draw_center_line(self):
         """Draw dashed line in the center of the court"""
         for y in range(0, self.HEIGHT, 30):
             self.canvas.create_line(
                 self.WIDTH / 2, y, self.WIDTH / 2, y + 15,
-                fill="white", width=2
+                fill="white", width=2, tags="court"
             )
 
-    def key_bindings(self):
-        """Set up keyboard controls"""
-        # Player 1 controls (W and S keys)
-        self.root.bind("<w>", lambda e: self.move_paddle1(-self.PADDLE_SPEED))
-        self.root.bind("<s>", lambda e: self.move_paddle1(self.PADDLE_SPEED))
-        self.root.bind("<W>", lambda e: self.move_paddle1(-self.PADDLE_SPEED))
-        self.root.bind("<S>", lambda e: self.move_paddle1(self.PADDLE_SPEED))
-
-        # Player 2 controls (Up and Down arrow keys)
-        self.root.bind("<Up>", lambda e: self.move_paddle2(-self.PADDLE_SPEED))
-        self.root.bind("<Down>", lambda e: self.move_paddle2(self.PADDLE_SPEED))
-
-        # Game controls
-        self.root.bind("<space>", lambda e: self.toggle_pause())
-        self.root.bind("<r>", lambda e: self.reset_game())
-
-    def move_paddle1(self, dy):
-        """Move player 1's paddle"""
-        if self.game_over or self.paused:
-            return
-
-        current_pos = self.canvas.coords(self.paddle1)
-        new_y = current_pos[1] + dy
-
-        # Check boundaries
-        if new_y > 0 and new_y + self.PADDLE_HEIGHT < self.HEIGHT:
-            self.canvas.move(self.paddle1, 0, dy)
-            self.paddle1_y = new_y
-
-    def move_paddle2(self, dy):
-        """Move player 2's paddle"""
-        if self.game_over or self.paused:
-            return
-
-        current_pos = self.canvas.coords(self.paddle2)
-        new_y = current_pos[1] + dy
-
-        # Check boundaries
-        if new_y > 0 and new_y + self.PADDLE_HEIGHT < self.HEIGHT:
-            self.canvas.move(self.paddle2, 0, dy)
-            self.paddle2_y = new_y
-
-    def move_ball(self):
-        """Update ball position and handle collisions"""
-        # Move ball
-        self.canvas.move(self.ball, self.ball_dx, self.ball_dy)
-
-        # Get current ball position
-        ball_pos = self.canvas.coords(self.ball)
-        ball_left = ball_pos[0]
-        ball_top = ball_pos[1]
-        ball_right = ball_pos[2]
-        ball_bottom = ball_pos[3]
-
-        # Wall collisions (top and bottom)
-        if ball_top <= 0 or ball_bottom >= self.HEIGHT:
-            self.ball_dy = -self.ball_dy
-
-        # Paddle collisions
-        if ball_left <= 10 + self.PADDLE_WIDTH:
-            # Check if ball hit paddle1
-            paddle1_pos = self.canvas.coords(self.paddle1)
-            if ball_bottom >= paddle1_pos[1] and ball_top <= paddle1_pos[3]:
-                # Calculate impact point on paddle (0 to 1)
-                relative_impact = (ball_top + self.BALL_SIZE / 2 - paddle1_pos[1]) / self.PADDLE_HEIGHT
-                self.handle_paddle_collision(relative_impact)
-
-        elif ball_right >= self.WIDTH - 10 - self.PADDLE_WIDTH:
-            # Check if ball hit paddle2
-            paddle2_pos = self.canvas.coords(self.paddle2)
-            if ball_bottom >= paddle2_pos[1] and ball_top <= paddle2_pos[3]:
-                # Calculate impact point on paddle (0 to 1)
-                relative_impact = (ball_top + self.BALL_SIZE / 2 - paddle2_pos[1]) / self.PADDLE_HEIGHT
-                self.handle_paddle_collision(relative_impact)
-
-        # Score (ball out of bounds)
-        if ball_left <= 0:
-            self.player2_score += 1
-            self.update_scores()
-            self.reset_ball()
-
-        elif ball_right >= self.WIDTH:
-            self.player1_score += 1
-            self.update_scores()
-            self.reset_ball()
+    def create_overlays(self):
+        """Create the countdown, pause and game over overlays, hidden until they are shown"""
+        self.countdown_text = self.canvas.create_text(
+            self.WIDTH / 2, self.HEIGHT / 2 - 60, text="",
+            fill="white", font=("Arial", 32), state="hidden"
+        )
+        self.pause_text = self.canvas.create_text(
+            self.WIDTH / 2, self.HEIGHT / 2,
+            text="PAUSED\nPress SPACE to continue",
+            fill="white", font=("Arial", 20),
+            justify="center", state="hidden"
+        )
 
-    def handle_paddle_collision(self, relative_impact):
-        """Handle ball bouncing off a paddle with angle based on where it hit"""
-        # Reverse horizontal direction
-        self.ball_dx = -self.ball_dx
+        game_over_box = self.canvas.create_rectangle(
+            self.WIDTH / 4, self.HEIGHT / 3,
+            3 * self.WIDTH / 4, 2 * self.HEIGHT / 3,
+            fill="black", outline="white", width=2, state="hidden"
+        )
+        self.winner_text = self.canvas.create_text(
+            self.WIDTH / 2, self.HEIGHT / 2 - 20, text="",
+            fill="white", font=("Arial", 24), state="hidden"
+        )
+        restart_text = self.canvas.create_text(
+            self.WIDTH / 2, self.HEIGHT / 2 + 20,
+            text="Press 'r' to restart",
+            fill="white", font=("Arial", 18), state="hidden"
+        )
+        self.game_over_items = (game_over_box, self.winner_text, restart_text)
 
-        # Increase speed slightly with each hit
-        speed_factor = min(abs(self.ball_dx) + self.ACCELERATION_FACTOR, self.MAX_BALL_SPEED)
-        if self.ball_dx > 0:
-            self.ball_dx = speed_factor
+    def key_bindings(self):
+        """Set up keyboard controls"""
+        # Player 1 controls (W and S keys), player 2 controls (Up and Down arrow keys).
+        # Only the held state is tracked, the game loop moves the paddles.
+        for key, paddle in PADDLE_KEYS.items():
+            self.root.bind(f"<KeyPress-{key}>", lambda e, paddle=paddle: self.held.add(paddle))
+            self.root.bind(f"<KeyRelease-{key}>", lambda e, paddle=paddle: self.held.discard(paddle))
+        # Releases are lost while the window is unfocused, don't keep moving
+        self.root.bind("<FocusOut>", lambda e: self.held.clear())
+
+        # Game controls, the host has them in a network game
+        if not self.client:
+            self.root.bind("<space>", lambda e: self.toggle_pause())
+            self.root.bind("<r>", lambda e: self.reset_game())
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def paddle_direction(self, player):
+        """-1 (up), 0 or 1 (down) from the network, the CPU player or the keys held for a paddle"""
+        if player == 1 and self.host:
+            return self.remote_move
+        if player in self.ai:
+            return self.ai[player].direction(self.physics)
+        return ((player, 1) in self.held) - ((player, -1) in self.held)
+
+    def render(self):
+        """Push model positions to the canvas, once per frame and only for items that moved"""
+        physics = self.physics
+        drawn = self.drawn
+        paddle1_y, paddle2_y = physics.paddle_y
+        if self.chaos:
+            # Nearly every ball moves every frame
+            ball_x = ball_y = None
+            size = physics.ball_size
+            coords = self.canvas.coords
+            for item, x, y in zip(self.balls, physics.x.tolist(), physics.y.tolist()):
+                coords(item, x, y, x + size, y + size)
         else:
-            self.ball_dx = -speed_factor
-
-        # Adjust vertical direction based on where the ball hit the paddle
-        # Middle of paddle = straight, top = upward angle, bottom = downward angle
-        new_angle = (relative_impact - 0.5) * 2  # Range from -1 to 1
-        self.ball_dy = new_angle * abs(self.ball_dx) * 0.8  # Scale vertical component
-
-    def reset_ball(self):
-        """Reset the ball to the center after a point is scored"""
-        # Move ball to center
-        current_pos = self.canvas.coords(self.ball)
-        dx = self.WIDTH / 2 - (current_pos[0] + self.BALL_SIZE / 2)
-        dy = self.HEIGHT / 2 - (current_pos[1] + self.BALL_SIZE / 2)
-        self.canvas.move(self.ball, dx, dy)
-
-        # Reset ball position variables
-        self.ball_x = self.WIDTH / 2 - self.BALL_SIZE / 2
-        self.ball_y = self.HEIGHT / 2 - self.BALL_SIZE / 2
-
-        # Set random direction
-        self.ball_dx = self.INITIAL_BALL_SPEED * random.choice([-1, 1])
-        self.ball_dy = self.INITIAL_BALL_SPEED * random.choice([-0.8, 0.8])
-
-        # Brief pause
-        self.canvas.update()
-        time.sleep(1)
+            ball_x, ball_y = physics.ball_x, physics.ball_y
+            if (ball_x, ball_y) != drawn[:2]:
+                self.canvas.coords(self.ball, ball_x, ball_y, ball_x + self.BALL_SIZE, ball_y + self.BALL_SIZE)
+        if paddle1_y != drawn[2]:
+            self.canvas.coords(self.paddle1, 10, paddle1_y, 10 + self.PADDLE_WIDTH, paddle1_y + self.PADDLE_HEIGHT)
+        if paddle2_y != drawn[3]:
+            self.canvas.coords(self.paddle2, self.WIDTH - 10 - self.PADDLE_WIDTH, paddle2_y,
+                               self.WIDTH - 10, paddle2_y + self.PADDLE_HEIGHT)
+        self.drawn = (ball_x, ball_y, paddle1_y, paddle2_y)
+
+    def show_countdown(self):
+        """Show the whole seconds left before the serve"""
+        seconds = math.ceil(self.match.countdown_ticks / round(1000 / self.FRAME_MS))
+        if seconds != self.countdown_shown:
+            self.canvas.itemconfig(self.countdown_text, text=str(seconds), state="normal")
+            self.countdown_shown = seconds
+
+    def serve(self):
+        """Hide the countdown once the ball is back in play"""
+        if self.countdown_shown is not None:
+            self.canvas.itemconfig(self.countdown_text, state="hidden")
+            self.countdown_shown = None
 
     def update_scores(self):
         """Update the score displays"""
         self.canvas.itemconfig(self.p1_score_display, text=f"Player 1: {self.player1_score}")
         self.canvas.itemconfig(self.p2_score_display, text=f"Player 2: {self.player2_score}")
 
-        # Check for game over (first to 5 points)
-        if self.player1_score >= 5 or self.player2_score >= 5:
-            self.game_over = True
+        # The match ends the game at 5 points
+        if self.game_over:
+            self.save_log()
             self.show_game_over()
 
     def show_game_over(self):
         """Display game over message"""
-        winner = "Player 1" if self.player1_score >= 5 else "Player 2"
-        self.canvas.create_rectangle(
-            self.WIDTH / 4, self.HEIGHT / 3,
-            3 * self.WIDTH / 4, 2 * self.HEIGHT / 3,
-            fill="black", outline="white", width=2
-        )
-        self.canvas.create_text(
-            self.WIDTH / 2, self.HEIGHT / 2 - 20,
-            text=f"{winner} Wins!",
-            fill="white", font=("Arial", 24)
-        )
-        self.canvas.create_text(
-            self.WIDTH / 2, self.HEIGHT / 2 + 20,
-            text="Press 'r' to restart",
-            fill="white", font=("Arial", 18)
-        )
+        winner = f"Player {self.match.winner + 1}"
+        self.canvas.itemconfig(self.winner_text, text=f"{winner} Wins!")
+        for item in self.game_over_items:
+            self.canvas.itemconfig(item, state="normal")
 
     def toggle_pause(self):
         """Pause or resume the game"""
         self.paused = not self.paused
-        if self.paused:
-            self.pause_text = self.canvas.create_text(
-                self.WIDTH / 2, self.HEIGHT / 2,
-                text="PAUSED\nPress SPACE to continue",
-                fill="white", font=("Arial", 20),
-                justify="center"
-            )
-        else:
-            self.canvas.delete(self.pause_text)
+        self.canvas.itemconfig(self.pause_text, state="normal" if self.paused else "hidden")
 
     def reset_game(self):
         """Reset the game to initial state"""
-        self.player1_score = 0
-        self.player2_score = 0
-        self.game_over = False
-        self.paused = False
+        self.save_log()
+        self.start_log()
+        self.new_match()
 
-        # Clear canvas and redraw everything
-        self.canvas.delete("all")
-        self.init_game_objects()
-        self.draw_center_line()
-
-        # Recreate score displays
-        self.p1_score_display = self.canvas.create_text(
-            self.WIDTH / 4, 30, text=f"Player 1: {self.player1_score}",
-            fill="white", font=("Arial", 16)
-        )
-
-        self.p2_score_display = self.canvas.create_text(
-            3 * self.WIDTH / 4, 30, text=f"Player 2: {self.player2_score}",
-            fill="white", font=("Arial", 16)
-        )
+        # Hide the overlays and move the paddles and ball back, the rest of the scene stays
+        self.paused = False
+        self.canvas.itemconfig(self.pause_text, state="hidden")
+        for item in self.game_over_items:
+            self.canvas.itemconfig(item, state="hidden")
+        self.serve()
+        self.update_scores()
+        self.drawn = (None, None, None, None)
+        self.render()
 
     def game_loop(self):
-        """Main game loop"""
-        if not self.game_over and not self.paused:
-            self.move_ball()
+        """Advance the game one step, called by the scheduler every FRAME_MS"""
+        if self.client:
+            self.client_step()
+            return
+        if self.host:
+            # The client's inputs are used up and its snapshots sent even while nothing moves
+            self.host.poll()
+            self.remote_move = self.host.remote_direction()
+        if not (self.game_over or self.paused):
+            self.play_step()
+        if self.host:
+            self.host.send_snapshot(self.match, self.paused)
+
+    def play_step(self):
+        """Step the match with this tick's moves"""
+        if self.replay:
+            if self.replay_tick >= len(self.replay):
+                self.scheduler.stop()
+                return
+            value = self.replay.inputs[self.replay_tick]
+            self.replay_tick += 1
+        else:
+            # Sample the held keys once per tick and record them
+            value = encode_moves((self.paddle_direction(0), self.paddle_direction(1)))
+            self.log.record(value)
 
-        # Continue loop
-        self.root.after(16, self.game_loop)  # ~60 FPS
+        # The match moves the paddles and the ball, the canvas catches up in render()
+        if self.match.step(decode_moves(value)):
+            self.update_scores()
+        self.update_countdown()
+
+    def client_step(self):
+        """Send this tick's input to the host and catch up with its latest snapshot"""
+        scores, game_over = list(self.match.scores), self.game_over
+        self.client.poll()
+        if game_over and not self.game_over:
+            self.reset_game()  # the host started a new game
+
+        # Either set of keys steers our paddle
+        self.client.step(self.paddle_direction(1) or self.paddle_direction(0))
+        if self.match.scores != scores or self.game_over != game_over:
+            self.update_scores()
+        if self.client.paused != self.paused:
+            self.toggle_pause()
+        self.update_countdown()
+
+    def update_countdown(self):
+        """Count down before serving, the game loop keeps running meanwhile"""
+        if self.match.serve_state == COUNTDOWN:
+            self.show_countdown()
+        else:
+            self.serve()
 
 
 # Start the game
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pong")
+    parser.add_argument("--seed", type=int, help="session seed, makes every game reproducible")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save each game's replay, numbered before the extension: PATH-1.ext, PATH-2.ext, ...")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="watch a replay (use replay.py to play one back headless)")
+    parser.add_argument("--serve-delay", type=int, default=1000, metavar="MS",
+                        help="countdown before each serve, 0 to serve at once")
+    parser.add_argument("--cpu", choices=["1", "2", "both"], help="let the computer play this paddle")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="medium")
+    network = parser.add_mutually_exclusive_group()
+    network.add_argument("--host", type=int, metavar="PORT", help="host a network game, the client plays paddle 2")
+    network.add_argument("--connect", metavar="HOST:PORT", help="join a network game as paddle 2")
+    parser.add_argument("--net-delay", type=float, default=0, metavar="MS",
+                        help="add this one-way delay to packets sent, for testing")
+    parser.add_argument("--net-loss", type=float, default=0, metavar="FRACTION",
+                        help="drop this fraction of packets sent, for testing")
+    parser.add_argument("--chaos", type=int, default=0, metavar="BALLS",
+                        help="chaos mode: play with this many balls at once, 5 points per ball to win")
+    args = parser.parse_args()
+    cpu = {None: (), "1": (0,), "2": (1,), "both": (0, 1)}[args.cpu]
+    if args.host is not None and 1 in cpu or args.connect and 0 in cpu:
+        parser.error("the other machine plays that paddle")
+    if args.replay and (args.host is not None or args.connect):
+        parser.error("replays can't be played over the network")
+    if args.chaos and (cpu or args.replay or args.record or args.host is not None or args.connect):
+        parser.error("chaos mode is for two players at one keyboard")
+    if args.chaos and importlib.util.find_spec("numpy") is None:
+        parser.error("chaos mode needs NumPy")
+
+    link = None
+    impairment = {"delay": args.net_delay / 1000, "loss": args.net_loss}
+    if args.host is not None:
+        link = open_link(("0.0.0.0", args.host), **impairment)
+    elif args.connect:
+        address, port = args.connect.rsplit(":", 1)
+        # Replies come from the resolved address, the link compares against it
+        link = open_link(("0.0.0.0", 0), (socket.gethostbyname(address), int(port)), **impairment)
+
     root = tk.Tk()
-    game = PongGame(root)
+    replay = InputLog.load(args.replay) if args.replay else None
+    game = PongGame(root, seed=args.seed, replay=replay, record_path=args.record,
+                    serve_delay_ms=args.serve_delay, cpu=cpu, difficulty=args.difficulty,
+                    link=link, client=bool(args.connect), chaos=args.chaos)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import random
+
+# difficulty -> (reaction delay in ticks, standard deviation of the aim error in pixels)
+DIFFICULTIES = {
+    "easy": (24, 45),
+    "medium": (12, 28),
+    "hard": (6, 20),
+    "perfect": (0, 0),
+}
+
+
+def predict_y(physics, player):
+    """Ball centre y when it reaches the player's paddle face, or None if it is moving away
+
+    Wall bounces are folded analytically: the ball's path is unrolled into
+    a straight line over mirrored copies of the court and mapped back, so
+    the cost doesn't depend on how many bounces there are.
+    """
+    dx = physics.ball_dx
+    if player == 0:
+        if dx >= 0:
+            return None
+        frames = (physics.left_face - physics.ball_x) / dx
+    else:
+        if dx <= 0:
+            return None
+        frames = (physics.right_face - physics.ball_x) / dx
+    frames = max(frames, 0)
+
+    span = physics.height - physics.ball_size  # range of the ball's top edge
+    y = (physics.ball_y + physics.ball_dy * frames) % (2 * span)
+    if y > span:
+        y = 2 * span - y
+    return y + physics.ball_size / 2
+
+
+class PongAI:
+    """CPU player for one paddle
+
+    The landing point is predicted once per velocity change (paddle hit,
+    wall bounce or serve), after a reaction delay, with a random aim error;
+    every other tick just compares the paddle to that target. Controls the
+    paddle through the same -1/0/1 directions as the keyboard.
+    """
+
+    def __init__(self, player, difficulty="medium", rng=None, dead_zone=5):
+        self.player = player
+        self.reaction_ticks, self.aim_error = DIFFICULTIES[difficulty]
+        self.rng = rng or random.Random()
+        self.dead_zone = dead_zone  # don't chase targets closer than this, avoids jitter
+
+        self.seen_changes = None  # physics.velocity_changes of the last prediction
+        self.due = None  # tick the pending prediction is made on
+        self.tick = 0
+        self.target = None
+
+    def direction(self, physics):
+        """-1 (up), 0 or 1 (down) for this tick"""
+        self.tick += 1
+        if physics.velocity_changes != self.seen_changes:
+            # The ball changed course, react to it after the delay
+            self.seen_changes = physics.velocity_changes
+            self.due = self.tick + self.reaction_ticks
+        if self.due is not None and self.tick >= self.due:
+            self.due = None
+            self.target = predict_y(physics, self.player)
+            if self.target is not None and self.aim_error:
+                self.target += self.rng.gauss(0, self.aim_error)
+
+        # Wait in the middle while the ball is going away
+        target = self.target if self.target is not None else physics.height / 2
+        center = physics.paddle_y[self.player] + physics.paddle_height / 2
+        if center < target - self.dead_zone:
+            return 1
+        if center > target + self.dead_zone:
+            return -1
+        return 0
@@ -0,0 +1,323 @@
+import argparse
+import time
+
+import numpy as np
+
+from pong_match import PLAY
+
+# Events a ball can meet during a frame, as in PongPhysics.step
+NO_EVENT = 0
+WALL = 1
+PADDLE = 2
+GOAL = 3
+
+# Grid cells searched for partners: the cell itself and the four neighbours "after" it,
+# so each pair of neighbouring cells is visited once
+FORWARD_CELLS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+# First to 5 points, for every ball in play
+POINTS_PER_BALL = 5
+
+
+class ChaosPhysics:
+    """Hundreds of balls on one Pong court, stepped together in NumPy
+
+    Walls, paddles and goals work as in PongPhysics: every ball is swept
+    through its frame, bouncing at the exact time it meets something, with
+    the same angle and speed-up off a paddle. The balls are done in bulk,
+    each pass handling the next event of every ball that still has one.
+    A ball that scores is served again from the centre line.
+
+    Balls also bounce off each other as equal discs. Pairs are found with
+    a uniform grid of one-ball cells: a ball can only touch balls in its
+    own or a neighbouring cell, so the work grows with the number of
+    balls, not the number of pairs.
+    """
+
+    MAX_EVENTS = 16
+
+    def __init__(self, balls=300, width=800, height=500, paddle_width=15, paddle_height=80, ball_size=8,
+                 paddle_margin=10, initial_speed=5, max_speed=15, acceleration=0.1, seed=None):
+        self.width = width
+        self.height = height
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.ball_size = ball_size
+        self.initial_speed = initial_speed
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.rng = np.random.default_rng(seed)
+
+        self.left_face = paddle_margin + paddle_width
+        self.right_face = width - paddle_margin - paddle_width - ball_size
+        self.grid_cols = int(width // ball_size) + 1
+        self.grid_rows = int(height // ball_size) + 1
+
+        self.paddle_y = [0.0, 0.0]
+        self.center_paddles()
+        self.x = np.zeros(balls)
+        self.y = np.zeros(balls)
+        self.dx = np.zeros(balls)
+        self.dy = np.zeros(balls)
+        self.serve(np.arange(balls), width / 3)
+
+        self.pairs_tested = 0  # candidate pairs from the grid in the last frame
+        self.contacts = 0  # of which actually bounced
+
+    @property
+    def balls(self):
+        return len(self.x)
+
+    def center_paddles(self):
+        self.paddle_y = [self.height / 2 - self.paddle_height / 2] * 2
+
+    def move_paddle(self, player, dy):
+        """Move paddle 0 (left) or 1 (right), keeping it on the court"""
+        y = self.paddle_y[player] + dy
+        self.paddle_y[player] = min(max(y, 0), self.height - self.paddle_height)
+
+    def serve(self, balls, spread=0):
+        """Put balls on the centre line (give or take spread) heading off diagonally"""
+        count = len(balls)
+        rng = self.rng
+        self.x[balls] = self.width / 2 - self.ball_size / 2 + rng.uniform(-spread / 2, spread / 2, count)
+        self.y[balls] = rng.uniform(0, self.height - self.ball_size, count)
+        self.dx[balls] = self.initial_speed * rng.choice([-1, 1], count)
+        self.dy[balls] = self.initial_speed * rng.uniform(-0.8, 0.8, count)
+
+    def step(self):
+        """Advance every ball one frame; returns the points (player 1, player 2) scored"""
+        points = self.move_balls()
+        self.collide_balls()
+        return points
+
+    def move_balls(self):
+        balls = self.balls
+        remaining = np.ones(balls)
+        active = np.arange(balls)
+        bottom = self.height - self.ball_size
+        goal_right = self.width - self.ball_size
+        points = [0, 0]
+
+        for _ in range(self.MAX_EVENTS):
+            if not active.size:
+                break
+            x, y = self.x[active], self.y[active]
+            dx, dy = self.dx[active], self.dy[active]
+
+            # Time to each kind of event; later kinds win ties, as in PongPhysics.earliest
+            with np.errstate(divide="ignore", invalid="ignore"):
+                wall = np.where(dy < 0, -y / dy, np.where(dy > 0, (bottom - y) / dy, np.inf))
+                face = np.where((dx < 0) & (x > self.left_face), (self.left_face - x) / dx,
+                                np.where((dx > 0) & (x < self.right_face), (self.right_face - x) / dx, np.inf))
+                goal = np.where(dx < 0, -x / dx, np.where(dx > 0, (goal_right - x) / dx, np.inf))
+            when = remaining[active]
+            event = np.full(active.size, NO_EVENT)
+            for kind, candidate in ((WALL, wall), (PADDLE, face), (GOAL, goal)):
+                take = (candidate >= 0) & (candidate <= when)
+                when = np.where(take, candidate, when)
+                event[take] = kind
+
+            self.x[active] = x + dx * when
+            self.y[active] = y + dy * when
+            remaining[active] -= when
+
+            walls = active[event == WALL]
+            self.dy[walls] = -self.dy[walls]
+
+            at_face = event == PADDLE
+            if at_face.any():
+                self.hit_paddles(active[at_face], (dx[at_face] > 0).astype(np.intp))
+
+            at_goal = event == GOAL
+            if at_goal.any():
+                # Out of bounds: a point for the other side, and the ball is served again
+                scorers = active[at_goal]
+                right = dx[at_goal] > 0
+                points[0] += int(right.sum())
+                points[1] += int((~right).sum())
+                self.serve(scorers)
+
+            active = active[(event == WALL) | at_face]
+        return tuple(points)
+
+    def hit_paddles(self, balls, players):
+        """Bounce the balls at a paddle face that overlap it, let the others pass"""
+        top = np.array(self.paddle_y)[players]
+        y = self.y[balls]
+        overlap = (y + self.ball_size >= top) & (y <= top + self.paddle_height)
+        balls = balls[overlap]
+        impact = (y[overlap] + self.ball_size / 2 - top[overlap]) / self.paddle_height
+        self.handle_paddle_collision(balls, impact)
+
+    def handle_paddle_collision(self, balls, relative_impact):
+        """PongPhysics.handle_paddle_collision for many balls at once"""
+        speed = np.minimum(np.abs(self.dx[balls]) + self.acceleration, self.max_speed)
+        self.dx[balls] = np.where(self.dx[balls] > 0, -speed, speed)
+        self.dy[balls] = (relative_impact - 0.5) * 2 * speed * 0.8
+
+    def candidate_pairs(self):
+        """(a, b) index arrays of the ball pairs in the same or neighbouring grid cells"""
+        size = self.ball_size
+        cols = np.clip(((self.x + size / 2) // size).astype(np.intp), 0, self.grid_cols - 1)
+        rows = np.clip(((self.y + size / 2) // size).astype(np.intp), 0, self.grid_rows - 1)
+        keys = rows * self.grid_cols + cols
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        cols, rows = cols[order], rows[order]
+        positions = np.arange(len(order))
+
+        first, second = [], []
+        for dc, dr in FORWARD_CELLS:
+            near_cols, near_rows = cols + dc, rows + dr
+            valid = (near_cols >= 0) & (near_cols < self.grid_cols) & (near_rows < self.grid_rows)
+            near_keys = near_rows * self.grid_cols + near_cols
+            start = np.searchsorted(sorted_keys, near_keys, "left")
+            end = np.searchsorted(sorted_keys, near_keys, "right")
+            if dc == dr == 0:
+                start = positions + 1  # same cell: only the balls sorted after this one
+            counts = np.where(valid, np.maximum(end - start, 0), 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Expand every ball into one entry per partner in the neighbouring cell
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            first.append(np.repeat(positions, counts))
+            second.append(np.repeat(start, counts) + offsets)
+        if not first:
+            return np.empty(0, np.intp), np.empty(0, np.intp)
+        return order[np.concatenate(first)], order[np.concatenate(second)]
+
+    def collide_balls(self):
+        """Bounce touching balls that are moving towards each other"""
+        a, b = self.candidate_pairs()
+        self.pairs_tested = len(a)
+        size = self.ball_size
+        gap_x = self.x[b] - self.x[a]
+        gap_y = self.y[b] - self.y[a]
+        distance2 = gap_x * gap_x + gap_y * gap_y
+        closing = gap_x * (self.dx[b] - self.dx[a]) + gap_y * (self.dy[b] - self.dy[a])
+        hit = (distance2 < size * size) & (distance2 > 0) & (closing < 0)
+        self.contacts = int(hit.sum())
+        if not self.contacts:
+            return
+
+        a, b = a[hit], b[hit]
+        distance = np.sqrt(distance2[hit])
+        normal_x = gap_x[hit] / distance
+        normal_y = gap_y[hit] / distance
+        # Equal masses: swap the velocity components along the line between the centres,
+        # and push the discs apart so they don't stay stuck together
+        along = closing[hit] / distance
+        push = (size - distance) / 2
+        balls = self.balls
+        for velocity, position, normal in ((self.dx, self.x, normal_x), (self.dy, self.y, normal_y)):
+            velocity += (np.bincount(a, along * normal, balls) - np.bincount(b, along * normal, balls))
+            position += (np.bincount(b, push * normal, balls) - np.bincount(a, push * normal, balls))
+        np.clip(self.x, 0, self.width - size, out=self.x)
+        np.clip(self.y, 0, self.height - size, out=self.y)
+
+        # Keep every ball crossing the court at a playable speed
+        direction = np.where(self.dx < 0, -1.0, 1.0)
+        self.dx[:] = direction * np.clip(np.abs(self.dx), self.initial_speed / 2, self.max_speed)
+        np.clip(self.dy, -self.max_speed, self.max_speed, out=self.dy)
+
+
+class ChaosMatch:
+    """A chaos game driven like PongMatch, first to POINTS_PER_BALL points per ball
+
+    There is no serve countdown, every ball is served again as soon as it
+    scores.
+    """
+
+    def __init__(self, physics, paddle_speed=5, winning_score=None):
+        self.physics = physics
+        self.paddle_speed = paddle_speed
+        self.winning_score = winning_score or POINTS_PER_BALL * physics.balls
+        self.scores = [0, 0]
+        self.winner = None
+        self.serve_state = PLAY
+        self.countdown_ticks = 0
+        self.ticks = 0
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def step(self, moves):
+        """Advance one tick with (player 1, player 2) directions; returns the points scored, or None"""
+        if self.winner is not None:
+            return None
+        self.ticks += 1
+        for player, direction in enumerate(moves):
+            if direction:
+                self.physics.move_paddle(player, direction * self.paddle_speed)
+
+        points = self.physics.step()
+        if not any(points):
+            return None
+        for player in (0, 1):
+            self.scores[player] += points[player]
+        leader = 0 if self.scores[0] >= self.scores[1] else 1
+        if self.scores[leader] >= self.winning_score:
+            self.winner = leader
+        return points
+
+
+def brute_force_pairs(physics):
+    """Every touching pair by checking all n^2/2 pairs, to compare against the grid"""
+    a, b = np.triu_indices(physics.balls, 1)
+    gap_x = physics.x[b] - physics.x[a]
+    gap_y = physics.y[b] - physics.y[a]
+    touching = gap_x * gap_x + gap_y * gap_y < physics.ball_size ** 2
+    return a[touching], b[touching]
+
+
+def benchmark(counts, frames, ball_size, brute_limit, seed):
+    """Frame time against ball count, with the grid's pair search checked against brute force"""
+    print(f"{'balls':>6} {'move ms':>8} {'collide ms':>10} {'frame ms':>9} {'pairs tested':>13} "
+          f"{'contacts':>9} {'brute force ms':>15}")
+    for balls in counts:
+        physics = ChaosPhysics(balls, ball_size=ball_size, seed=seed)
+        move = collide = 0.0
+        pairs = contacts = 0
+        for _ in range(frames):
+            start = time.perf_counter()
+            physics.move_balls()
+            middle = time.perf_counter()
+            physics.collide_balls()
+            move += middle - start
+            collide += time.perf_counter() - middle
+            pairs += physics.pairs_tested
+            contacts += physics.contacts
+
+        brute = "-"
+        if balls <= brute_limit:
+            start = time.perf_counter()
+            a, b = brute_force_pairs(physics)
+            brute = f"{(time.perf_counter() - start) * 1000:.2f}"
+            found = set(zip(a.tolist(), b.tolist()))
+            grid_a, grid_b = physics.candidate_pairs()
+            candidates = {(min(i, j), max(i, j)) for i, j in zip(grid_a.tolist(), grid_b.tolist())}
+            if not found <= candidates:
+                raise AssertionError(f"the grid missed {len(found - candidates)} touching pairs")
+
+        print(f"{balls:>6} {move / frames * 1000:>8.2f} {collide / frames * 1000:>10.2f} "
+              f"{(move + collide) / frames * 1000:>9.2f} {pairs // frames:>13} {contacts / frames:>9.1f} "
+              f"{brute:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-ball Pong physics")
+    parser.add_argument("--balls", type=int, nargs="+", default=[100, 250, 500, 1000, 2000, 4000])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--ball-size", type=float, default=6)
+    parser.add_argument("--brute-limit", type=int, default=2000,
+                        help="check the grid against all-pairs search up to this many balls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.balls, args.frames, args.ball_size, args.brute_limit, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from pong_ai import PongAI, DIFFICULTIES
+from pong_physics import PongPhysics, PLAYER1_SCORED
+
+# Serve states: the ball waits in the centre during the countdown, then is in play
+COUNTDOWN = "countdown"
+PLAY = "play"
+
+
+def encode_moves(moves):
+    """One input byte for a tick: player 1's direction in the low nibble, player 2's in the high one"""
+    return (moves[0] & 0x0F) | (moves[1] & 0x0F) << 4
+
+
+def decode_moves(value):
+    """(player 1, player 2) directions from an input byte"""
+    return tuple(nibble - 16 if nibble > 7 else nibble for nibble in (value & 0x0F, value >> 4))
+
+
+class PongMatch:
+    """Rules of one Pong game on top of PongPhysics, with no Tk involved
+
+    step() takes each paddle's direction for the tick, moves the paddles,
+    runs the serve countdown or the ball, and keeps the score until one
+    player reaches winning_score. The window, replays and the simulator
+    all drive games through it, so they play by the same rules.
+    """
+
+    def __init__(self, physics, rng, serve_ticks=0, paddle_speed=5, winning_score=5):
+        self.physics = physics
+        self.rng = rng
+        self.serve_ticks = serve_ticks  # countdown before each serve after a point
+        self.paddle_speed = paddle_speed  # pixels per tick
+        self.winning_score = winning_score
+
+        self.scores = [0, 0]
+        self.winner = None  # 0 or 1 once the game is over
+        self.serve_state = PLAY
+        self.countdown_ticks = 0
+        self.ticks = 0
+        self.rallies = []  # paddle hits in each point played
+        self.rally_start = physics.paddle_hits
+
+        physics.center_paddles()
+        physics.reset_ball(rng)
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def step(self, moves):
+        """Advance one tick with (player 1, player 2) directions; returns who scored, or None"""
+        if self.winner is not None:
+            return None
+        self.ticks += 1
+        physics = self.physics
+        for player, direction in enumerate(moves):
+            if direction:
+                physics.move_paddle(player, direction * self.paddle_speed)
+
+        # Paddles can move during the countdown, the ball waits
+        if self.serve_state == COUNTDOWN:
+            self.countdown_ticks -= 1
+            if self.countdown_ticks > 0:
+                return None
+            self.serve_state = PLAY
+
+        scored = physics.step()
+        if scored:
+            self.update_scores(scored)
+        return scored
+
+    def update_scores(self, scored):
+        """Count a point, then end the game (first to winning_score) or serve again"""
+        player = 0 if scored == PLAYER1_SCORED else 1
+        self.scores[player] += 1
+        self.rallies.append(self.physics.paddle_hits - self.rally_start)
+        if self.scores[player] >= self.winning_score:
+            self.winner = player
+        else:
+            self.reset_ball()
+
+    def reset_ball(self):
+        """Put the ball back in the centre and start the countdown to the next serve"""
+        self.physics.reset_ball(self.rng)
+        self.rally_start = self.physics.paddle_hits
+        if self.serve_ticks:
+            self.serve_state = COUNTDOWN
+            self.countdown_ticks = self.serve_ticks
+
+
+def play_match(physics, controllers, rng, serve_ticks=0, max_ticks=36000):
+    """Play a game between two controllers and return the PongMatch
+
+    A controller is a callable taking the physics and returning its
+    paddle's direction for the tick, like PongAI.direction. Games still
+    going after max_ticks are stopped with no winner.
+    """
+    match = PongMatch(physics, rng, serve_ticks)
+    left, right = controllers
+    step = match.step
+    while match.winner is None and match.ticks < max_ticks:
+        step((left(physics), right(physics)))
+    return match
+
+
+def play_batch(args):
+    """Worker entry point: play CPU-vs-CPU games with consecutive seeds"""
+    difficulties, physics_options, serve_ticks, max_ticks, first_seed, games = args
+    wins = [0, 0, 0]  # player 1, player 2, unfinished
+    rallies = Counter()
+    ticks = 0
+    for seed in range(first_seed, first_seed + games):
+        physics = PongPhysics(**physics_options)
+        # Seeded like the window's CPU players, so a game can be watched again with --seed
+        controllers = [PongAI(player, difficulty, random.Random(f"{seed}:{player}")).direction
+                       for player, difficulty in enumerate(difficulties)]
+        match = play_match(physics, controllers, random.Random(seed), serve_ticks, max_ticks)
+        wins[2 if match.winner is None else match.winner] += 1
+        rallies.update(match.rallies)
+        ticks += match.ticks
+    return wins, rallies, ticks
+
+
+def percentile(counts, fraction):
+    """Smallest value with at least fraction of the counted samples at or below it"""
+    total = sum(counts.values())
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= fraction * total:
+            return value
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate CPU-vs-CPU Pong games on all cores")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--p1", choices=list(DIFFICULTIES), default="medium", help="player 1's difficulty")
+    parser.add_argument("--p2", choices=list(DIFFICULTIES), default="medium", help="player 2's difficulty")
+    parser.add_argument("--acceleration", type=float, default=0.1, help="ball speed gained per paddle hit")
+    parser.add_argument("--max-speed", type=float, default=15, help="ball speed cap, pixels per tick")
+    parser.add_argument("--serve-ticks", type=int, default=0, help="countdown before each serve")
+    parser.add_argument("--max-ticks", type=int, default=36000,
+                        help="give up on a game after this many ticks (default 10 minutes at 60 FPS)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=100, help="games per work item")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    physics_options = {"acceleration": args.acceleration, "max_speed": args.max_speed}
+    work = []
+    for start in range(0, args.games, args.batch):
+        games = min(args.batch, args.games - start)
+        work.append(((args.p1, args.p2), physics_options, args.serve_ticks, args.max_ticks,
+                     args.seed + start, games))
+
+    wins = [0, 0, 0]
+    rallies = Counter()
+    ticks = 0
+    begin = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        for batch_wins, batch_rallies, batch_ticks in pool.imap_unordered(play_batch, work):
+            wins = [a + b for a, b in zip(wins, batch_wins)]
+            rallies.update(batch_rallies)
+            ticks += batch_ticks
+    elapsed = time.perf_counter() - begin
+
+    games = sum(wins)
+    points = sum(rallies.values())
+    print(f"{games} games, {args.p1} vs {args.p2}, acceleration {args.acceleration}, "
+          f"max speed {args.max_speed}, {args.processes} processes")
+    print(f"player 1 won {wins[0] / games:.1%}, player 2 {wins[1] / games:.1%}, "
+          f"unfinished {wins[2] / games:.1%}")
+    if points:
+        mean = sum(hits * n for hits, n in rallies.items()) / points
+        print(f"rally length in paddle hits over {points} points: mean {mean:.1f}, "
+              + ", ".join(f"p{round(q * 100)} {percentile(rallies, q)}" for q in (0.1, 0.5, 0.9, 0.99))
+              + f", max {max(rallies)}")
+
+        # Histogram in at most 12 equal buckets
+        width = max(1, -(-(max(rallies) + 1) // 12))
+        buckets = Counter()
+        for hits, n in rallies.items():
+            buckets[hits // width] += n
+        for bucket in range(max(buckets) + 1):
+            share = buckets[bucket] / points
+            low = bucket * width
+            label = str(low) if width == 1 else f"{low}-{low + width - 1}"
+            print(f"  {label:>9} {share:6.1%} {'#' * round(share * 50)}")
+    print(f"{games / elapsed:,.0f} games/s, {ticks / elapsed:,.0f} ticks/s ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
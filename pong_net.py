@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import random
+import struct
+import threading
+from collections import deque, namedtuple
+
+from pong_ai import PongAI, DIFFICULTIES
+from pong_match import PongMatch, COUNTDOWN, PLAY
+from pong_physics import PongPhysics
+
+FRAME_S = 1 / 60
+SNAPSHOT_EVERY = 2  # host ticks per snapshot, 30 a second
+
+# Client -> host: b"I", newest input tick, the last INPUT_HISTORY directions at 2 bits each (newest lowest)
+INPUT = struct.Struct("<cIH")
+INPUT_HISTORY = 8
+
+# Host -> client: b"S", host tick, last client input tick applied, ball x, y, dx, dy,
+# paddle 1 y, paddle 2 y, scores, serve countdown ticks, winner (-1 for none), paused
+SNAPSHOT = struct.Struct("<cII6fBBBbB")
+Snapshot = namedtuple("Snapshot", "kind tick ack ball_x ball_y ball_dx ball_dy paddle1_y paddle2_y "
+                                  "score1 score2 countdown winner paused")
+
+JITTER_TICKS = 3  # the host applies client inputs this far behind the newest one received
+MAX_INPUT_LAG = 12  # further behind than this and the host skips ahead
+INTERP_TICKS = 6  # the client draws the ball this far behind the newest snapshot
+EXTRAPOLATE_TICKS = 8  # how far past the newest snapshot the client keeps the ball moving
+RESYNC_TICKS = 30  # the client's host clock jumps instead of drifting past this error
+CLOCK_GAIN = 0.05
+CORRECTION_PX = 0.5  # prediction errors below this aren't counted
+UDP_OVERHEAD = 28  # IPv4 and UDP headers per datagram
+
+
+def pack_input(tick, history):
+    """Input packet for tick; history holds the newest directions, oldest first"""
+    bits = 0
+    for i, direction in enumerate(reversed(history)):
+        bits |= (direction & 3) << 2 * i
+    return INPUT.pack(b"I", tick, bits)
+
+
+class UdpLink(asyncio.DatagramProtocol):
+    """One end of the game's UDP connection, with optional simulated delay and loss
+
+    Received datagrams wait in inbox until the game loop collects them and
+    send() may be called from any thread, so the link can run on an event
+    loop in a background thread while Tk owns the main one. A host learns
+    its peer from the first datagram; anything from other addresses is
+    ignored.
+    """
+
+    def __init__(self, remote=None, delay=0.0, jitter=0.0, loss=0.0, rng=None):
+        self.remote = remote
+        self.delay = delay  # seconds added to every datagram sent
+        self.jitter = jitter  # plus up to this much more, so packets can arrive out of order
+        self.loss = loss  # fraction of datagrams dropped instead of sent
+        self.rng = rng or random.Random()
+        self.inbox = deque()
+        self.transport = None
+        self.loop = None
+        self.owns_loop = False  # the loop's thread was started for this link
+
+        self.packets_sent = self.bytes_sent = self.dropped = 0
+        self.packets_received = self.bytes_received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = asyncio.get_running_loop()
+
+    def datagram_received(self, data, addr):
+        if self.remote is None:
+            self.remote = addr
+        elif addr != self.remote:
+            return
+        self.packets_received += 1
+        self.bytes_received += len(data)
+        self.inbox.append(data)
+
+    def receive(self):
+        """Datagrams received since the last call"""
+        data = []
+        while self.inbox:
+            data.append(self.inbox.popleft())
+        return data
+
+    def send(self, data):
+        if self.remote is None or self.transport is None:
+            return
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+        self.loop.call_soon_threadsafe(self.transmit, data)
+
+    def transmit(self, data):
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.delay + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            self.loop.call_later(delay, self.transport.sendto, data, self.remote)
+        else:
+            self.transport.sendto(data, self.remote)
+
+    def close(self):
+        if self.transport is not None:
+            self.loop.call_soon_threadsafe(self.transport.close)
+            if self.owns_loop:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def open_link(local_addr, remote=None, **impairment):
+    """Bind a UdpLink on an event loop in a daemon thread and return it"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    endpoint = loop.create_datagram_endpoint(lambda: UdpLink(remote, **impairment), local_addr=local_addr)
+    _, link = asyncio.run_coroutine_threadsafe(endpoint, loop).result(timeout=5)
+    link.owns_loop = True
+    return link
+
+
+class HostSession:
+    """Host end: feeds the client's inputs to the match and sends snapshots back
+
+    Every client input carries its tick and is applied on exactly one host
+    tick, in order, JITTER_TICKS behind the newest one received so uneven
+    arrival doesn't starve the match. Each packet repeats the previous
+    INPUT_HISTORY inputs, so one lost packet costs nothing. An input that
+    still hasn't arrived when its turn comes is an underrun: the last
+    direction is repeated and the client corrects its prediction.
+    """
+
+    def __init__(self, link):
+        self.link = link
+        self.tick = 0
+        self.inputs = {}  # client tick -> direction, waiting for its turn
+        self.next_input = None  # client tick applied next, None until the client shows up
+        self.direction = 0
+        self.underruns = 0
+
+    def poll(self):
+        for data in self.link.receive():
+            self.receive(data)
+
+    def receive(self, data):
+        if len(data) != INPUT.size or data[:1] != b"I":
+            return
+        _, tick, bits = INPUT.unpack(data)
+        if self.next_input is None:
+            self.next_input = tick - JITTER_TICKS
+        elif tick - self.next_input > MAX_INPUT_LAG:
+            # Fell behind (a pause, a burst of late packets), catch up with the client
+            for old in range(self.next_input, tick - JITTER_TICKS):
+                self.inputs.pop(old, None)
+            self.next_input = tick - JITTER_TICKS
+
+        for i in range(INPUT_HISTORY):
+            if tick - i < self.next_input:
+                break
+            value = bits >> 2 * i & 3
+            self.inputs[tick - i] = value - 4 if value > 1 else value
+
+    def remote_direction(self):
+        """The client's direction for this tick; call once per host tick"""
+        if self.next_input is None:
+            return 0
+        direction = self.inputs.pop(self.next_input, None)
+        if direction is None:
+            # Ticks before the client's first input only fill the jitter buffer
+            self.underruns += self.next_input > 0
+            direction = self.direction
+        self.direction = direction
+        self.next_input += 1
+        return direction
+
+    def send_snapshot(self, match, paused=False):
+        """Count a host tick and snapshot the match every SNAPSHOT_EVERY ticks"""
+        self.tick += 1
+        if self.tick % SNAPSHOT_EVERY:
+            return
+        physics = match.physics
+        countdown = match.countdown_ticks if match.serve_state == COUNTDOWN else 0
+        self.link.send(SNAPSHOT.pack(
+            b"S", self.tick, max((self.next_input or 0) - 1, 0),
+            physics.ball_x, physics.ball_y, physics.ball_dx, physics.ball_dy,
+            physics.paddle_y[0], physics.paddle_y[1], match.scores[0], match.scores[1],
+            min(countdown, 255), -1 if match.winner is None else match.winner, paused
+        ))
+
+
+class ClientSession:
+    """Client end: predicts its own paddle and interpolates the rest of the host's game
+
+    view is the PongPhysics the window draws. Paddle 2 moves as soon as
+    it is steered and is reconciled with every snapshot: the host's
+    position after the last input it applied, plus the inputs it hasn't
+    applied yet. The ball and paddle 1 are drawn INTERP_TICKS behind the
+    newest snapshot, between the two snapshots around that time, so late
+    and lost snapshots don't show. The scores and serve state mirror the
+    host's PongMatch, so the window can read them the same way.
+    """
+
+    def __init__(self, link, view, paddle_speed=5):
+        self.link = link
+        self.view = view
+        self.paddle_speed = paddle_speed
+        self.tick = 0
+        self.history = deque(maxlen=INPUT_HISTORY)
+        self.pending = deque(maxlen=256)  # (tick, direction) the host hasn't applied yet
+        self.snapshots = deque(maxlen=32)
+        self.latest = None
+        self.clock = None  # estimated host tick, fractional
+        self.velocity = None
+
+        self.scores = [0, 0]
+        self.winner = None
+        self.serve_state = PLAY
+        self.countdown_ticks = 0
+        self.paused = False
+
+        self.corrections = 0
+        self.largest_correction = 0.0
+        self.interpolated = self.extrapolated = 0
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def poll(self):
+        for data in self.link.receive():
+            self.receive(data)
+
+    def receive(self, data):
+        if len(data) != SNAPSHOT.size or data[:1] != b"S":
+            return
+        snap = Snapshot._make(SNAPSHOT.unpack(data))
+        if self.latest is not None and snap.tick <= self.latest.tick:
+            return  # late or duplicated
+        self.latest = snap
+        self.snapshots.append(snap)
+        self.scores = [snap.score1, snap.score2]
+        self.winner = None if snap.winner < 0 else snap.winner
+        self.serve_state = COUNTDOWN if snap.countdown else PLAY
+        self.countdown_ticks = snap.countdown
+        self.paused = bool(snap.paused)
+
+        # Replay the inputs the host hasn't seen on top of its paddle
+        while self.pending and self.pending[0][0] <= snap.ack:
+            self.pending.popleft()
+        view = self.view
+        y = view.paddle_y[1]
+        view.paddle_y[1] = snap.paddle2_y
+        if self.predicting:
+            for _, direction in self.pending:
+                if direction:
+                    view.move_paddle(1, direction * self.paddle_speed)
+        error = abs(view.paddle_y[1] - y)
+        if error > CORRECTION_PX:
+            self.corrections += 1
+            self.largest_correction = max(self.largest_correction, error)
+
+    @property
+    def predicting(self):
+        # The host doesn't move paddles while the game is paused or over
+        return self.latest is not None and not (self.paused or self.game_over)
+
+    def step(self, direction):
+        """Send this tick's direction, move the paddle and place the ball for drawing"""
+        self.tick += 1
+        self.history.append(direction)
+        self.link.send(pack_input(self.tick, self.history))
+        if self.predicting:
+            self.pending.append((self.tick, direction))
+            if direction:
+                self.view.move_paddle(1, direction * self.paddle_speed)
+        self.interpolate()
+
+    def interpolate(self):
+        latest = self.latest
+        if latest is None:
+            return
+        # Follow the host's clock, smoothly unless it is far off
+        if self.clock is None or abs(latest.tick - self.clock) > RESYNC_TICKS:
+            self.clock = latest.tick
+        else:
+            self.clock += 1 + (latest.tick - self.clock) * CLOCK_GAIN
+        when = self.clock - INTERP_TICKS
+
+        before = after = None
+        for snap in reversed(self.snapshots):
+            if snap.tick <= when:
+                before = snap
+                break
+            after = snap
+        view = self.view
+        if before is None:
+            before = after
+        if after is None or after is before:
+            # Ran past the newest snapshot, keep the ball going for a while
+            ahead = min(max(when - before.tick, 0), EXTRAPOLATE_TICKS)
+            self.extrapolated += ahead > 0
+            x = before.ball_x + before.ball_dx * ahead
+            y = min(max(before.ball_y + before.ball_dy * ahead, 0), view.height - view.ball_size)
+            paddle1_y = before.paddle1_y
+        else:
+            self.interpolated += 1
+            ticks = after.tick - before.tick
+            f = (when - before.tick) / ticks
+            if abs(after.ball_x - before.ball_x) > ticks * view.max_speed + 1:
+                # The ball was served again in between, don't draw it flying back to the centre
+                f = float(f >= 0.5)
+            x = before.ball_x + (after.ball_x - before.ball_x) * f
+            y = before.ball_y + (after.ball_y - before.ball_y) * f
+            paddle1_y = before.paddle1_y + (after.paddle1_y - before.paddle1_y) * f
+
+        view.ball_x, view.ball_y = x, y
+        view.paddle_y[0] = paddle1_y
+        velocity = (before.ball_dx, before.ball_dy)
+        if velocity != self.velocity:
+            # Lets a CPU player steering this paddle react to bounces
+            self.velocity = velocity
+            view.ball_dx, view.ball_dy = velocity
+            view.velocity_changes += 1
+
+
+async def loopback(args):
+    """Host and client on localhost in one event loop, through impaired links; returns the report"""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(args.seed)
+    impairment = {"delay": args.delay / 1000, "jitter": args.jitter / 1000, "loss": args.loss}
+    _, host_link = await loop.create_datagram_endpoint(
+        lambda: UdpLink(rng=random.Random(rng.random()), **impairment), local_addr=("127.0.0.1", 0))
+    address = host_link.transport.get_extra_info("sockname")
+    _, client_link = await loop.create_datagram_endpoint(
+        lambda: UdpLink(address, rng=random.Random(rng.random()), **impairment), local_addr=("127.0.0.1", 0))
+
+    physics = PongPhysics()
+    match = PongMatch(physics, random.Random(rng.random()), serve_ticks=60)
+    host = HostSession(host_link)
+    client = ClientSession(client_link, PongPhysics())
+    player1 = PongAI(0, args.difficulty, random.Random(rng.random()))
+    player2 = PongAI(1, args.difficulty, random.Random(rng.random()))
+
+    truth = {}  # host tick -> ball position
+    errors = []
+    deadline = loop.time()
+    for _ in range(round(args.seconds / FRAME_S)):
+        host.poll()
+        remote = host.remote_direction()
+        if match.game_over:
+            match = PongMatch(physics, match.rng, serve_ticks=60)
+        match.step((player1.direction(physics), remote))
+        host.send_snapshot(match)
+        truth[host.tick] = (physics.ball_x, physics.ball_y)
+
+        client.poll()
+        client.step(player2.direction(client.view))
+        if client.clock is not None:
+            # Compare the drawn ball with where the host had it at the drawn time
+            when = client.clock - INTERP_TICKS
+            low = truth.get(int(when))
+            high = truth.get(int(when) + 1)
+            if low and high and abs(high[0] - low[0]) <= physics.max_speed:
+                f = when - int(when)
+                x = low[0] + (high[0] - low[0]) * f
+                y = low[1] + (high[1] - low[1]) * f
+                errors.append(((client.view.ball_x - x) ** 2 + (client.view.ball_y - y) ** 2) ** 0.5)
+
+        deadline += FRAME_S
+        await asyncio.sleep(max(deadline - loop.time(), 0))
+
+    await asyncio.sleep(args.delay / 1000 + args.jitter / 1000)  # let the last packets land
+    host_link.transport.close()
+    client_link.transport.close()
+
+    lines = [f"{args.seconds:g}s, one-way delay {args.delay:g}+{args.jitter:g} ms, {args.loss:.0%} loss each way"]
+    for name, link in (("host -> client", host_link), ("client -> host", client_link)):
+        lines.append(f"{name}: {link.packets_sent / args.seconds:.0f} packets/s, "
+                     f"{link.bytes_sent / args.seconds:,.0f} B/s payload, "
+                     f"{(link.bytes_sent + UDP_OVERHEAD * link.packets_sent) / args.seconds:,.0f} B/s with "
+                     f"UDP/IP headers, {link.dropped} dropped")
+    lines.append(f"client paddle: {client.corrections} corrections (largest {client.largest_correction:.1f} px), "
+                 f"{host.underruns} host input underruns")
+    errors.sort()
+    if errors:
+        lines.append(f"ball: {client.interpolated} ticks interpolated, {client.extrapolated} extrapolated, "
+                     f"error vs host mean {sum(errors) / len(errors):.2f} px, "
+                     f"p99 {errors[int(len(errors) * 0.99)]:.2f} px, max {errors[-1]:.2f} px")
+    lines.append(f"score Player 1 {match.scores[0]} - {match.scores[1]} Player 2")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play CPU-vs-CPU network Pong over localhost UDP with simulated delay and loss")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--delay", type=float, default=50, help="one-way delay, ms")
+    parser.add_argument("--jitter", type=float, default=20, help="extra random delay up to this, ms")
+    parser.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped each way")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="hard")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(asyncio.run(loopback(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import random
+
+# Results of PongPhysics.step
+PLAYER1_SCORED = 1
+PLAYER2_SCORED = 2
+
+# Things the ball can meet during a frame
+WALL = "wall"
+LEFT_PADDLE = "left paddle"
+RIGHT_PADDLE = "right paddle"
+LEFT_GOAL = "left goal"
+RIGHT_GOAL = "right goal"
+
+
+class PongPhysics:
+    """Ball and paddle state of a Pong court, with no Tk involved
+
+    Positions are canvas pixels: the ball's top-left corner and each
+    paddle's top edge. Velocities are pixels per frame. Collisions are
+    swept: every frame the ball travels its whole path, bouncing at the
+    exact time it meets a wall or a paddle face, so it can't skip through
+    a paddle or hit the same wall twice at any speed.
+    """
+
+    # Bounces handled within one frame before the rest of the frame is dropped
+    MAX_EVENTS = 16
+
+    def __init__(self, width=800, height=500, paddle_width=15, paddle_height=80, ball_size=15,
+                 paddle_margin=10, initial_speed=5, max_speed=15, acceleration=0.1):
+        self.width = width
+        self.height = height
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.ball_size = ball_size
+        self.paddle_margin = paddle_margin  # gap between a paddle and its side of the court
+        self.initial_speed = initial_speed
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+
+        # Paddle faces, as the ball's x when it touches them
+        self.left_face = paddle_margin + paddle_width
+        self.right_face = width - paddle_margin - paddle_width - ball_size
+
+        self.paddle_y = [0.0, 0.0]
+        self.center_paddles()
+        self.ball_x = 0.0
+        self.ball_y = 0.0
+        self.ball_dx = 0.0
+        self.ball_dy = 0.0
+        self.velocity_changes = 0  # bumped whenever the ball changes course, for predictions
+        self.paddle_hits = 0
+
+    def center_paddles(self):
+        self.paddle_y = [self.height / 2 - self.paddle_height / 2] * 2
+
+    def reset_ball(self, rng=random):
+        """Put the ball in the centre with a random diagonal direction"""
+        self.ball_x = self.width / 2 - self.ball_size / 2
+        self.ball_y = self.height / 2 - self.ball_size / 2
+        self.ball_dx = self.initial_speed * rng.choice([-1, 1])
+        self.ball_dy = self.initial_speed * rng.choice([-0.8, 0.8])
+        self.velocity_changes += 1
+
+    def move_paddle(self, player, dy):
+        """Move paddle 0 (left) or 1 (right), keeping it on the court"""
+        y = self.paddle_y[player] + dy
+        self.paddle_y[player] = min(max(y, 0), self.height - self.paddle_height)
+
+    def step(self):
+        """Advance the ball one frame; returns who scored, or None"""
+        # Most frames meet nothing: start and end strictly inside the court means no event between
+        x = self.ball_x + self.ball_dx
+        y = self.ball_y + self.ball_dy
+        if self.left_face < x < self.right_face and 0 < y < self.height - self.ball_size:
+            self.ball_x = x
+            self.ball_y = y
+            return None
+
+        remaining = 1.0
+        for _ in range(self.MAX_EVENTS):
+            x, y, dx, dy = self.ball_x, self.ball_y, self.ball_dx, self.ball_dy
+
+            # Earliest event within what is left of the frame
+            when, event = remaining, None
+            if dy < 0:
+                when, event = self.earliest(when, event, -y / dy, WALL)
+            elif dy > 0:
+                when, event = self.earliest(when, event, (self.height - self.ball_size - y) / dy, WALL)
+            if dx < 0:
+                if x > self.left_face:
+                    when, event = self.earliest(when, event, (self.left_face - x) / dx, LEFT_PADDLE)
+                when, event = self.earliest(when, event, -x / dx, LEFT_GOAL)
+            elif dx > 0:
+                if x < self.right_face:
+                    when, event = self.earliest(when, event, (self.right_face - x) / dx, RIGHT_PADDLE)
+                when, event = self.earliest(when, event, (self.width - self.ball_size - x) / dx, RIGHT_GOAL)
+
+            self.ball_x = x + dx * when
+            self.ball_y = y + dy * when
+            remaining -= when
+
+            if event is None:
+                return None
+            if event == WALL:
+                self.ball_dy = -dy
+                self.velocity_changes += 1
+            elif event == LEFT_PADDLE:
+                self.hit_paddle(0)
+            elif event == RIGHT_PADDLE:
+                self.hit_paddle(1)
+            else:
+                # Ball out of bounds
+                return PLAYER2_SCORED if event == LEFT_GOAL else PLAYER1_SCORED
+        return None
+
+    @staticmethod
+    def earliest(when, event, candidate, candidate_event):
+        if 0 <= candidate <= when:
+            return candidate, candidate_event
+        return when, event
+
+    def hit_paddle(self, player):
+        """Bounce off a paddle face if the ball overlaps it, else let it pass"""
+        top = self.paddle_y[player]
+        ball_top = self.ball_y
+        if ball_top + self.ball_size >= top and ball_top <= top + self.paddle_height:
+            # Calculate impact point on paddle (0 to 1)
+            relative_impact = (ball_top + self.ball_size / 2 - top) / self.paddle_height
+            self.handle_paddle_collision(relative_impact)
+
+    def handle_paddle_collision(self, relative_impact):
+        """Handle ball bouncing off a paddle with angle based on where it hit"""
+        # Reverse horizontal direction
+        self.ball_dx = -self.ball_dx
+        self.velocity_changes += 1
+        self.paddle_hits += 1
+
+        # Increase speed slightly with each hit
+        speed_factor = min(abs(self.ball_dx) + self.acceleration, self.max_speed)
+        if self.ball_dx > 0:
+            self.ball_dx = speed_factor
+        else:
+            self.ball_dx = -speed_factor
+
+        # Adjust vertical direction based on where the ball hit the paddle
+        # Middle of paddle = straight, top = upward angle, bottom = downward angle
+        new_angle = (relative_impact - 0.5) * 2  # Range from -1 to 1
+        self.ball_dy = new_angle * abs(self.ball_dx) * 0.8  # Scale vertical component
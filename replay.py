@@ -0,0 +1,118 @@
+import argparse
+import os
+import random
+import struct
+import time
+
+from pong_match import PongMatch, decode_moves
+from pong_physics import PongPhysics
+from snake_engine import SnakeEngine, DIRECTIONS
+
+
+MAGIC = b"RPLY"
+VERSION = 3
+# magic, version, game tag, seed, board width, board height, tick count, serve delay ticks
+HEADER = struct.Struct("<4sBcQHHIH")
+# Version 1 had no serve delay
+HEADER_V1 = struct.Struct("<4sBcQHHI")
+# Oldest version whose Pong games play back the same: version 1 used the old physics and
+# serve pause, version 2 stored key repeats rather than the paddle directions held each tick
+PONG_VERSION = 3
+
+SNAKE = b"S"
+PONG = b"P"
+
+# Snake logs store the direction applied on each tick as its index here
+SNAKE_DIRECTIONS = tuple(DIRECTIONS)
+
+
+def game_path(path, number):
+    """Where --record PATH keeps game number: games.rply -> games-1.rply, games-2.rply, ..."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{number}{ext}"
+
+
+class InputLog:
+    """Seed plus one input byte per simulated tick, enough to replay a game exactly."""
+
+    def __init__(self, game, seed, width=0, height=0, inputs=b"", serve_ticks=0):
+        self.game = game
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.inputs = bytearray(inputs)
+        self.serve_ticks = serve_ticks  # Pong: ticks of countdown before each serve
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, value):
+        self.inputs.append(value)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.game, self.seed, self.width, self.height, len(self.inputs),
+                                self.serve_ticks))
+            f.write(self.inputs)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, game, seed, width, height, ticks = HEADER_V1.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        if game != SNAKE and version < PONG_VERSION:
+            # Pong's rules or input bytes changed since, only Snake games still play back the same
+            raise ValueError(f"{path} is a version {version} Pong replay, which this version can't play back")
+        if version == 1:
+            header_size, serve_ticks = HEADER_V1.size, 0
+        else:
+            header_size, serve_ticks = HEADER.size, HEADER.unpack_from(data)[-1]
+
+        inputs = data[header_size:header_size + ticks]
+        if len(inputs) != ticks:
+            raise ValueError(f"{path} is truncated: {len(inputs)} of {ticks} ticks")
+        return cls(game, seed, width, height, inputs, serve_ticks)
+
+
+def play_snake(log):
+    """Replay a snake log without a GUI and return the final engine."""
+    engine = SnakeEngine(log.width, log.height, seed=log.seed)
+    for code in log.inputs:
+        engine.next_direction = SNAKE_DIRECTIONS[code]
+        engine.step()
+    return engine
+
+
+def play_pong(log):
+    """Replay a Pong log without a GUI and return the final match."""
+    match = PongMatch(PongPhysics(), random.Random(log.seed), log.serve_ticks)
+    for value in log.inputs:
+        match.step(decode_moves(value))
+    return match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a replay file headless at full speed")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    log = InputLog.load(args.path)
+    start = time.perf_counter()
+    if log.game == SNAKE:
+        engine = play_snake(log)
+        result = f"score {engine.score}, {'game over' if engine.game_over else 'still alive'}"
+    else:
+        match = play_pong(log)
+        result = f"Player 1 {match.scores[0]} - {match.scores[1]} Player 2"
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(log)} ticks in {elapsed:.3f}s: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+
+class FixedStepScheduler:
+    """Drives a game from Tk's event loop at a fixed simulation rate.
+
+    The scheduler owns the only pending root.after() handle of its game, so
+    starting it again cancels the previous loop instead of running two.
+    Simulation steps run from a time accumulator at exactly step_ms
+    intervals of game time; rendering happens once per frame at render_ms.
+    Each frame is scheduled against an absolute deadline, so the time spent
+    in update and render doesn't make the loop drift.
+    """
+
+    # Tk timers fire on whole milliseconds, allow a step to be due this early
+    TOLERANCE = 0.002
+
+    def __init__(self, root, step_ms, update, render=None, render_ms=None, max_steps=5,
+                 clock=time.perf_counter):
+        self.root = root
+        self.step = step_ms / 1000
+        self.interval = (render_ms if render_ms is not None else step_ms) / 1000
+        self.update = update
+        self.render = render
+        self.max_steps = max_steps  # steps per frame before the backlog is dropped
+        self.clock = clock
+
+        self.handle = None
+        self.accumulator = 0.0
+        self.last_time = 0.0
+        self.deadline = 0.0
+        self.intervals = deque(maxlen=120)  # measured frame intervals, seconds
+
+    @property
+    def running(self):
+        return self.handle is not None
+
+    def start(self):
+        """(Re)start the loop, cancelling any pending frame."""
+        self.stop()
+        self.accumulator = 0.0
+        self.intervals.clear()
+        self.last_time = self.clock()
+        self.deadline = self.last_time + self.interval
+        self.handle = self.root.after(int(self.interval * 1000 + 0.5), self.frame)
+
+    def stop(self):
+        """Cancel the pending frame, if any."""
+        if self.handle is not None:
+            self.root.after_cancel(self.handle)
+            self.handle = None
+
+    def resync(self):
+        """Forget time spent outside the loop (a blocking call, a long pause)."""
+        self.accumulator = 0.0
+        self.last_time = self.clock()
+        self.deadline = self.last_time
+
+    def frame(self):
+        """Run the simulation steps that are due, render, and schedule the next frame."""
+        now = self.clock()
+        elapsed = now - self.last_time
+        self.last_time = now
+        self.intervals.append(elapsed)
+
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator + self.TOLERANCE >= self.step and self.handle is not None:
+            self.update()
+            self.accumulator -= self.step
+            steps += 1
+            if steps == self.max_steps:
+                # Too far behind to catch up, drop the rest of the backlog
+                self.accumulator = min(self.accumulator, self.step)
+                break
+
+        # update() may have stopped the loop
+        if self.handle is None:
+            return
+
+        if self.render:
+            self.render()
+
+        self.deadline += self.interval
+        delay = self.deadline - self.clock()
+        if delay < -self.interval:
+            # Fell behind by more than a frame, don't try to make up the lost frames
+            self.deadline = self.clock()
+            delay = 0
+        self.handle = self.root.after(max(int(delay * 1000 + 0.5), 0), self.frame)
+
+    @property
+    def tick_jitter_ms(self):
+        """Mean absolute deviation of measured frame intervals from the target, ms."""
+        if not self.intervals:
+            return 0.0
+        return sum(abs(i - self.interval) for i in self.intervals) / len(self.intervals) * 1000
+
+    @property
+    def max_jitter_ms(self):
+        """Largest deviation of a measured frame interval from the target, ms."""
+        if not self.intervals:
+            return 0.0
+        return max(abs(i - self.interval) for i in self.intervals) * 1000
@@ -1,9 +1,179 @@
-import tkinter as tk
+import argparse
 import random
+import tkinter as tk
+from collections import deque
+
+from snake_engine import SnakeEngine, MOVED, ATE, DIED, WON
+from snake_ai import Autopilot
+from scheduler import FixedStepScheduler
+from replay import InputLog, SNAKE, SNAKE_DIRECTIONS, game_path
+
+
+class WorldView:
+    """Camera onto a snake world bigger than the canvas.
+
+    Only cells inside the view have canvas items. They come from a pool
+    of one rectangle per visible cell, made once, and go back to it when
+    their cell scrolls out of view or the tail leaves it, so the item
+    count and the work per tick depend on the window size, not the world
+    size. The camera follows the head, scrolling when it comes within
+    MARGIN cells of an edge: one canvas.move shifts every item, then only
+    the strip of cells that came into view is looked up.
+    """
+
+    MARGIN = 6
+
+    def __init__(self, canvas, engine, cols, rows, grid_size):
+        self.canvas = canvas
+        self.engine = engine
+        # A world narrower or shorter than the canvas is shown whole in that direction
+        self.cols = min(cols, engine.cols)
+        self.rows = min(rows, engine.rows)
+        self.grid_size = grid_size
+        self.left = 0
+        self.top = 0
+
+        # Outline the world where it ends inside the canvas, the rest of the canvas is off limits
+        self.border = None
+        if (self.cols, self.rows) != (cols, rows):
+            self.border = canvas.create_rectangle(0, 0, 0, 0, outline="gray", tags="world")
+
+        self.items = {}  # visible snake cell -> canvas item
+        self.pool = [
+            canvas.create_rectangle(0, 0, 0, 0, fill="green", outline="darkgreen", state="hidden", tags="world")
+            for _ in range(self.cols * self.rows)
+        ]
+        self.head = None
+        self.food_item = canvas.create_oval(0, 0, 0, 0, fill="red", outline="", tags="world")
+        self.food_visible = True
+
+    def reset(self):
+        """Centre the camera on the new snake and draw the cells in view."""
+        for cell in list(self.items):
+            self.release(cell)
+        self.head = None
+
+        engine = self.engine
+        head_x, head_y = engine.head
+        self.left = min(max(head_x - self.cols // 2, 0), max(engine.cols - self.cols, 0))
+        self.top = min(max(head_y - self.rows // 2, 0), max(engine.rows - self.rows, 0))
+        self.fill(range(self.left, self.left + self.cols), range(self.top, self.top + self.rows))
+        if self.border is not None:
+            self.canvas.coords(self.border, *self.cell_bbox((0, 0))[:2],
+                               *self.cell_bbox((engine.cols - 1, engine.rows - 1))[2:])
+        self.mark_head()
+        self.place_food()
+
+    def visible(self, cell):
+        return self.left <= cell[0] < self.left + self.cols and self.top <= cell[1] < self.top + self.rows
+
+    def cell_bbox(self, cell):
+        """Canvas bounding box of a world cell, relative to the camera."""
+        x = (cell[0] - self.left) * self.grid_size
+        y = (cell[1] - self.top) * self.grid_size
+        return x, y, x + self.grid_size, y + self.grid_size
+
+    def show(self, cell):
+        """Give a visible snake cell an item from the pool."""
+        item = self.pool.pop()
+        self.canvas.coords(item, *self.cell_bbox(cell))
+        self.canvas.itemconfig(item, state="normal", fill="green")
+        self.items[cell] = item
+
+    def release(self, cell):
+        item = self.items.pop(cell)
+        self.canvas.itemconfig(item, state="hidden")
+        self.pool.append(item)
+
+    def fill(self, cols, rows):
+        """Show the snake cells in a block of the view that have no item yet."""
+        engine = self.engine
+        occupied = engine.occupied
+        for row in rows:
+            for col in cols:
+                if occupied[row * engine.cols + col] and (col, row) not in self.items:
+                    self.show((col, row))
+
+    def update(self, result):
+        """Follow the snake's last move: drop the old tail, add the new head, scroll if needed."""
+        engine = self.engine
+        if engine.vacated in self.items:
+            self.release(engine.vacated)
+
+        head = engine.head
+        self.follow(head)
+        if head not in self.items:
+            self.show(head)
+        self.mark_head()
+        self.place_food()
+
+    def mark_head(self):
+        head = self.engine.head
+        if self.head in self.items and self.head != head:
+            self.canvas.itemconfig(self.items[self.head], fill="green")
+        if head in self.items:
+            self.canvas.itemconfig(self.items[head], fill="lime")
+        self.head = head
+
+    def follow(self, head):
+        """Scroll so the head stays MARGIN cells inside the view, as far as the world allows."""
+        left, top = self.left, self.top
+        if head[0] < left + self.MARGIN:
+            left = head[0] - self.MARGIN
+        elif head[0] >= left + self.cols - self.MARGIN:
+            left = head[0] - self.cols + self.MARGIN + 1
+        if head[1] < top + self.MARGIN:
+            top = head[1] - self.MARGIN
+        elif head[1] >= top + self.rows - self.MARGIN:
+            top = head[1] - self.rows + self.MARGIN + 1
+        left = min(max(left, 0), max(self.engine.cols - self.cols, 0))
+        top = min(max(top, 0), max(self.engine.rows - self.rows, 0))
+        if (left, top) != (self.left, self.top):
+            self.scroll(left - self.left, top - self.top)
+
+    def scroll(self, dcol, drow):
+        self.left += dcol
+        self.top += drow
+        self.canvas.move("world", -dcol * self.grid_size, -drow * self.grid_size)
+        for cell in [cell for cell in self.items if not self.visible(cell)]:
+            self.release(cell)
+
+        # Only the columns and rows that came into view can hold cells without an item
+        view_cols = range(self.left, self.left + self.cols)
+        view_rows = range(self.top, self.top + self.rows)
+        if dcol > 0:
+            self.fill(range(max(self.left + self.cols - dcol, self.left), self.left + self.cols), view_rows)
+        elif dcol < 0:
+            self.fill(range(self.left, min(self.left - dcol, self.left + self.cols)), view_rows)
+        if drow > 0:
+            self.fill(view_cols, range(max(self.top + self.rows - drow, self.top), self.top + self.rows))
+        elif drow < 0:
+            self.fill(view_cols, range(self.top, min(self.top - drow, self.top + self.rows)))
+
+    def place_food(self):
+        """Draw the food, or a ring on the edge of the view pointing at it when it is off screen."""
+        food = self.engine.food
+        if food is None:
+            self.canvas.itemconfig(self.food_item, state="hidden")
+            return
+
+        x0, y0, x1, y1 = self.cell_bbox(food)
+        visible = self.visible(food)
+        if not visible:
+            x0 = min(max(x0, 0), (self.cols - 1) * self.grid_size)
+            y0 = min(max(y0, 0), (self.rows - 1) * self.grid_size)
+            x1, y1 = x0 + self.grid_size, y0 + self.grid_size
+        self.canvas.coords(self.food_item, x0, y0, x1, y1)
+        if visible != self.food_visible:
+            if visible:
+                self.canvas.itemconfig(self.food_item, fill="red", outline="")
+            else:
+                self.canvas.itemconfig(self.food_item, fill="", outline="red", width=2)
+            self.food_visible = visible
 
 
 class SnakeGame:
-    def __init__(self, root):
+    def __init__(self, root, autopilot=None, seed=None, replay=None, record_path=None, world=None):
         self.root = root
         self.root.title("Snake Game")
         self.root.resizable(False, False)
@@ -14,15 +184,25 @@ class SnakeGame:
         self.GRID_SIZE = 20
         self.GAME_SPEED = 150  # milliseconds between updates
 
-        # Game variables
-        self.direction = "Right"
-        self.next_direction = "Right"
-        self.score = 0
-        self.game_over = False
-
-        # Initialize snake and food
-        self.snake = [(100, 100), (80, 100), (60, 100)]
-        self.food = self.create_food()
+        # Every game gets its own seed drawn from the session seed
+        self.seeds = random.Random(seed)
+        self.replay = replay
+        self.record_path = record_path  # each game is saved to its own numbered file, see game_path
+        self.games = 0
+
+        # Game state lives in the headless engine, in grid cells. A world of
+        # another size than the window is seen through a WorldView.
+        view_size = (self.WIDTH // self.GRID_SIZE, self.HEIGHT // self.GRID_SIZE)
+        if replay:
+            world = (replay.width, replay.height)
+        cols, rows = world or view_size
+        self.engine = SnakeEngine(cols, rows, seed=self.next_seed())
+        self.start_log()
+
+        # Optional AI controller, toggled with 'a'
+        self.autopilot = autopilot
+        if self.autopilot:
+            self.autopilot.reset(self.engine)
 
         # Create game canvas
         self.canvas = tk.Canvas(root, width=self.WIDTH, height=self.HEIGHT, bg="black")
@@ -34,147 +214,212 @@ class SnakeGame:
             fill="white", font=("Arial", 12), anchor="ne"
         )
 
+        # Canvas items for the snake (head first, parallel to engine.body) and food
+        self.segment_items = deque()
+        self.food_item = None
+        self.last_result = None
+        self.view = None
+        if (cols, rows) != view_size:
+            self.view = WorldView(self.canvas, self.engine, *view_size, self.GRID_SIZE)
+            self.canvas.tag_raise(self.score_display)
+        self.create_objects()
+
         # Set up key bindings
         self.root.bind("<KeyPress-Up>", lambda e: self.change_direction("Up"))
         self.root.bind("<KeyPress-Down>", lambda e: self.change_direction("Down"))
         self.root.bind("<KeyPress-Left>", lambda e: self.change_direction("Left"))
         self.root.bind("<KeyPress-Right>", lambda e: self.change_direction("Right"))
         self.root.bind("<KeyPress-r>", lambda e: self.reset_game())
+        self.root.bind("<KeyPress-a>", lambda e: self.toggle_autopilot())
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Start game
-        self.game_loop()
-
-    def create_food(self):
-        """Create a new food at a random position."""
-        x = random.randint(1, (self.WIDTH - self.GRID_SIZE) // self.GRID_SIZE) * self.GRID_SIZE
-        y = random.randint(1, (self.HEIGHT - self.GRID_SIZE) // self.GRID_SIZE) * self.GRID_SIZE
-
-        # Ensure food doesn't appear on snake
-        while (x, y) in self.snake:
-            x = random.randint(1, (self.WIDTH - self.GRID_SIZE) // self.GRID_SIZE) * self.GRID_SIZE
-            y = random.randint(1, (self.HEIGHT - self.GRID_SIZE) // self.GRID_SIZE) * self.GRID_SIZE
-
-        return (x, y)
+        self.scheduler = FixedStepScheduler(self.root, self.GAME_SPEED, self.game_loop)
+        self.scheduler.start()
+
+    def next_seed(self):
+        """Seed for the next game, taken from the replay when playing one back."""
+        if self.replay:
+            self.replay_tick = 0
+            return self.replay.seed
+        return self.seeds.getrandbits(64)
+
+    def start_log(self):
+        """Start recording the inputs of the current game."""
+        self.games += 1
+        self.log = InputLog(SNAKE, self.engine.seed, self.engine.cols, self.engine.rows)
+
+    def save_log(self):
+        """Write the current game's replay if recording was requested."""
+        if self.record_path and len(self.log):
+            self.log.save(game_path(self.record_path, self.games))
+
+    def close(self):
+        """Save the replay and close the window."""
+        self.save_log()
+        self.root.destroy()
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    @property
+    def game_over(self):
+        return self.engine.game_over
 
     def change_direction(self, new_direction):
         """Change the snake's direction ensuring it can't reverse onto itself."""
-        if (new_direction == "Left" and self.direction != "Right") or \
-                (new_direction == "Right" and self.direction != "Left") or \
-                (new_direction == "Up" and self.direction != "Down") or \
-                (new_direction == "Down" and self.direction != "Up"):
-            self.next_direction = new_direction
+        self.engine.change_direction(new_direction)
+
+    def toggle_autopilot(self):
+        """Switch the AI controller on or off."""
+        if self.autopilot:
+            self.autopilot = None
+        else:
+            self.autopilot = Autopilot()
+            self.autopilot.reset(self.engine)
 
     def move_snake(self):
         """Move the snake in the current direction."""
-        head_x, head_y = self.snake[0]
-
-        # Set direction for next move
-        self.direction = self.next_direction
-
-        # Calculate new head position
-        if self.direction == "Right":
-            new_head = (head_x + self.GRID_SIZE, head_y)
-        elif self.direction == "Left":
-            new_head = (head_x - self.GRID_SIZE, head_y)
-        elif self.direction == "Up":
-            new_head = (head_x, head_y - self.GRID_SIZE)
-        elif self.direction == "Down":
-            new_head = (head_x, head_y + self.GRID_SIZE)
-
-        # Check for collisions
-        if self.check_collision(new_head):
-            self.game_over = True
-            self.show_game_over()
-            return
+        self.log.record(SNAKE_DIRECTIONS.index(self.engine.next_direction))
+        result = self.last_result = self.engine.step()
 
-        # Add new head
-        self.snake.insert(0, new_head)
-
-        # Check if snake ate food
-        if new_head == self.food:
-            self.score += 10
+        if result == DIED:
+            self.show_game_over()
+        elif result == WON:
+            self.canvas.itemconfig(self.score_display, text=f"Score: {self.score}")
+            self.show_game_over(won=True)
+        elif result == ATE:
             self.canvas.itemconfig(self.score_display, text=f"Score: {self.score}")
-            self.food = self.create_food()
-        else:
-            # Remove tail if no food was eaten
-            self.snake.pop()
 
-    def check_collision(self, position):
-        """Check if the position collides with walls or snake body."""
-        x, y = position
+    def cell_bbox(self, cell):
+        """Canvas bounding box of a grid cell."""
+        x = cell[0] * self.GRID_SIZE
+        y = cell[1] * self.GRID_SIZE
+        return x, y, x + self.GRID_SIZE, y + self.GRID_SIZE
 
-        # Check wall collision
-        if x < 0 or x >= self.WIDTH or y < 0 or y >= self.HEIGHT:
-            return True
+    def create_objects(self):
+        """Create canvas items for the current snake and food."""
+        if self.view:
+            self.view.reset()
+            return
 
-        # Check self collision (excluding the tail which will move)
-        if position in self.snake[:-1]:
-            return True
+        self.segment_items.clear()
+        for segment in self.engine.body:
+            self.segment_items.append(self.canvas.create_rectangle(
+                *self.cell_bbox(segment),
+                fill="green", outline="darkgreen", tags="snake"
+            ))
 
-        return False
+        # Make head a different color
+        self.canvas.itemconfig(self.segment_items[0], fill="lime")
+
+        self.food_item = self.canvas.create_oval(*self.cell_bbox(self.engine.food), fill="red", tags="food")
 
     def draw_objects(self):
-        """Draw snake and food on the canvas."""
-        # Clear canvas
-        self.canvas.delete("snake", "food")
-
-        # Draw food
-        self.canvas.create_oval(
-            self.food[0], self.food[1],
-            self.food[0] + self.GRID_SIZE, self.food[1] + self.GRID_SIZE,
-            fill="red", tags="food"
-        )
+        """Update the snake and food items after the last move.
+
+        Only the head and tail change each tick: the tail item is moved to
+        the new head (or a new item is created when the snake grew), and
+        only the old and new head are recolored.
+        """
+        result, self.last_result = self.last_result, None
+        if result not in (MOVED, ATE, WON):
+            return
+        if self.view:
+            self.view.update(result)
+            return
 
-        # Draw snake
-        for segment in self.snake:
-            self.canvas.create_rectangle(
-                segment[0], segment[1],
-                segment[0] + self.GRID_SIZE, segment[1] + self.GRID_SIZE,
-                fill="green", outline="darkgreen", tags="snake"
+        head_bbox = self.cell_bbox(self.engine.head)
+        self.canvas.itemconfig(self.segment_items[0], fill="green")
+
+        if result == MOVED:
+            # Recycle the tail item as the new head
+            item = self.segment_items.pop()
+            self.canvas.coords(item, *head_bbox)
+            self.canvas.itemconfig(item, fill="lime")
+        else:
+            item = self.canvas.create_rectangle(
+                *head_bbox, fill="lime", outline="darkgreen", tags="snake"
             )
+        self.segment_items.appendleft(item)
 
-        # Make head a different color
-        head = self.snake[0]
-        self.canvas.create_rectangle(
-            head[0], head[1],
-            head[0] + self.GRID_SIZE, head[1] + self.GRID_SIZE,
-            fill="lime", outline="darkgreen", tags="snake"
-        )
+        if result == ATE:
+            self.canvas.coords(self.food_item, *self.cell_bbox(self.engine.food))
+        elif result == WON:
+            self.canvas.itemconfig(self.food_item, state="hidden")
 
-    def show_game_over(self):
+    def show_game_over(self, won=False):
         """Display game over message."""
+        title = "You Win!" if won else "Game Over!"
         self.canvas.create_text(
             self.WIDTH // 2, self.HEIGHT // 2,
-            text=f"Game Over! Score: {self.score}\nPress 'r' to restart",
-            fill="white", font=("Arial", 20), justify="center"
+            text=f"{title} Score: {self.score}\nPress 'r' to restart",
+            fill="white", font=("Arial", 20), justify="center", tags="game_over"
         )
 
     def reset_game(self):
         """Reset the game to initial state."""
-        self.direction = "Right"
-        self.next_direction = "Right"
-        self.score = 0
-        self.game_over = False
-        self.snake = [(100, 100), (80, 100), (60, 100)]
-        self.food = self.create_food()
-        self.canvas.itemconfig(self.score_display, text=f"Score: {self.score}")
-        self.canvas.delete("all")
-        self.score_display = self.canvas.create_text(
-            self.WIDTH - 50, 10, text=f"Score: {self.score}",
-            fill="white", font=("Arial", 12), anchor="ne"
-        )
-        self.game_loop()
+        self.save_log()
+        self.engine.reset(self.next_seed())
+        self.start_log()
+        if self.autopilot:
+            self.autopilot.reset(self.engine)
+        if self.view:
+            # The world view keeps its pooled items, only the message goes
+            self.canvas.delete("game_over")
+            self.canvas.itemconfig(self.score_display, text=f"Score: {self.score}")
+        else:
+            self.canvas.delete("all")
+            self.score_display = self.canvas.create_text(
+                self.WIDTH - 50, 10, text=f"Score: {self.score}",
+                fill="white", font=("Arial", 12), anchor="ne"
+            )
+        self.last_result = None
+        self.create_objects()
+        self.scheduler.start()
 
     def game_loop(self):
-        """Main game loop."""
-        if not self.game_over:
-            self.move_snake()
-            self.draw_objects()
-            self.root.after(self.GAME_SPEED, self.game_loop)
+        """Advance the game one step, called by the scheduler every GAME_SPEED ms."""
+        if self.replay:
+            if self.replay_tick >= len(self.replay):
+                self.scheduler.stop()
+                return
+            self.engine.next_direction = SNAKE_DIRECTIONS[self.replay.inputs[self.replay_tick]]
+            self.replay_tick += 1
+        elif self.autopilot:
+            self.change_direction(self.autopilot.next_direction(self.engine))
+        self.move_snake()
+        self.draw_objects()
+
+        if self.game_over:
+            self.scheduler.stop()
+            self.save_log()
 
 
 # Start the game
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake")
+    parser.add_argument("--seed", type=int, help="session seed, makes every game reproducible")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save each game's replay, numbered before the extension: PATH-1.ext, PATH-2.ext, ...")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="watch a replay (use replay.py to check one headless)")
+    parser.add_argument("--world", metavar="COLSxROWS",
+                        help="play in a world this big, seen through a camera following the head")
+    args = parser.parse_args()
+
+    world = None
+    if args.world:
+        try:
+            world = tuple(int(n) for n in args.world.lower().split("x"))
+        except ValueError:
+            world = ()
+        # The snake starts at cells up to (5, 5), replays store the size in 16 bits
+        if len(world) != 2 or not all(6 <= n <= 0xFFFF for n in world):
+            parser.error("--world must be COLSxROWS, each from 6 to 65535")
+
     root = tk.Tk()
-    game = SnakeGame(root)
+    replay = InputLog.load(args.replay) if args.replay else None
+    game = SnakeGame(root, seed=args.seed, replay=replay, record_path=args.record, world=world)
     root.mainloop()
\ No newline at end of file
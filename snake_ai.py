@@ -0,0 +1,348 @@
+import argparse
+import heapq
+import time
+from collections import deque
+
+from snake_engine import SnakeEngine, DIRECTIONS, OPPOSITE, ATE, DIED, WON
+
+
+def neighbours(engine, cell):
+    """Yield (direction, cell) pairs for the in-bounds neighbours of a cell."""
+    x, y = cell
+    for direction, (dx, dy) in DIRECTIONS.items():
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < engine.cols and 0 <= ny < engine.rows:
+            yield direction, (nx, ny)
+
+
+def bfs_path(engine, start, goal, occupied=None):
+    """Shortest list of directions from start to goal avoiding occupied cells.
+
+    The goal itself may be occupied (used to chase the tail). Returns None
+    when the goal can't be reached.
+    """
+    occupied = engine.occupied if occupied is None else occupied
+    cols = engine.cols
+    came_from = {start: None}
+    queue = deque([start])
+
+    while queue:
+        cell = queue.popleft()
+        if cell == goal:
+            return _walk_back(came_from, goal)
+
+        for direction, nxt in neighbours(engine, cell):
+            if nxt in came_from:
+                continue
+            if nxt != goal and occupied[nxt[1] * cols + nxt[0]]:
+                continue
+            came_from[nxt] = (cell, direction)
+            queue.append(nxt)
+
+    return None
+
+
+def _walk_back(came_from, goal):
+    path = []
+    step = came_from[goal]
+    while step is not None:
+        cell, direction = step
+        path.append(direction)
+        step = came_from[cell]
+    path.reverse()
+    return path
+
+
+def reachable_area(engine, start, limit):
+    """Number of free cells reachable from start, counting at most limit."""
+    cols = engine.cols
+    seen = {start}
+    queue = deque([start])
+    while queue and len(seen) < limit:
+        for _, nxt in neighbours(engine, queue.popleft()):
+            if nxt not in seen and not engine.occupied[nxt[1] * cols + nxt[0]]:
+                seen.add(nxt)
+                queue.append(nxt)
+    return len(seen)
+
+
+def safest_direction(engine):
+    """Non-fatal direction leading into the largest open area, if any."""
+    best, best_area = None, -1
+    limit = len(engine.body) + 1
+    for direction in DIRECTIONS:
+        if direction == OPPOSITE[engine.direction]:
+            continue
+        cell = engine.next_head(direction)
+        if engine.check_collision(cell):
+            continue
+        area = reachable_area(engine, cell, limit)
+        if area > best_area:
+            best, best_area = direction, area
+    return best
+
+
+class GreedyBFS:
+    """Shortest path to the food, ignoring what happens after eating it."""
+
+    name = "greedy"
+
+    def reset(self, engine):
+        pass
+
+    def plan(self, engine):
+        return bfs_path(engine, engine.head, engine.food)
+
+
+class AStarSafe:
+    """A* path to the food, only taken if the tail is still reachable afterwards.
+
+    When eating would trap the snake, it follows its own tail instead,
+    which always frees up space.
+    """
+
+    name = "astar"
+
+    def reset(self, engine):
+        pass
+
+    def plan(self, engine):
+        path = self.astar(engine, engine.head, engine.food)
+        if path and self.tail_reachable_after(engine, path):
+            return path
+
+        # Chasing the tail only commits to one move, then replans
+        path = bfs_path(engine, engine.head, engine.tail)
+        if path and len(engine.body) > 2:
+            return path[:1]
+        return None
+
+    def astar(self, engine, start, goal):
+        cols = engine.cols
+        gx, gy = goal
+        came_from = {start: None}
+        cost = {start: 0}
+        heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+        counter = 0
+
+        while heap:
+            _, _, cell = heapq.heappop(heap)
+            if cell == goal:
+                return _walk_back(came_from, goal)
+
+            next_cost = cost[cell] + 1
+            for direction, nxt in neighbours(engine, cell):
+                if engine.occupied[nxt[1] * cols + nxt[0]] and nxt != engine.tail:
+                    continue
+                if next_cost < cost.get(nxt, next_cost + 1):
+                    cost[nxt] = next_cost
+                    came_from[nxt] = (cell, direction)
+                    counter += 1
+                    estimate = next_cost + abs(nxt[0] - gx) + abs(nxt[1] - gy)
+                    heapq.heappush(heap, (estimate, counter, nxt))
+
+        return None
+
+    def tail_reachable_after(self, engine, path):
+        """Replay the path on a copy of the body and look for the tail."""
+        cols = engine.cols
+        body = deque(engine.body)
+        occupied = bytearray(engine.occupied)
+
+        for i, direction in enumerate(path):
+            dx, dy = DIRECTIONS[direction]
+            head = (body[0][0] + dx, body[0][1] + dy)
+            if i < len(path) - 1:
+                tail = body.pop()
+                occupied[tail[1] * cols + tail[0]] = 0
+            body.appendleft(head)
+            occupied[head[1] * cols + head[0]] = 1
+
+        if len(body) >= engine.cols * engine.rows:
+            return True
+        return bfs_path(engine, body[0], body[-1], occupied) is not None
+
+
+class HamiltonianCycle:
+    """Follow a fixed cycle through every cell, skipping ahead when safe.
+
+    The body always lies on the cycle between tail and head, so following
+    the cycle can never collide. Shortcuts jump forward along the cycle
+    towards the food as long as they land before the tail, and are only
+    taken while the snake is short.
+    """
+
+    name = "hamiltonian"
+
+    def __init__(self, shortcut_fill=0.5, margin=3):
+        self.shortcut_fill = shortcut_fill
+        self.margin = margin
+        self.order = None
+
+    def reset(self, engine):
+        self.size = engine.cols * engine.rows
+        self.order = self.build_cycle(engine.cols, engine.rows)
+
+        # Run the cycle in whichever direction matches the current body
+        head = self.order[engine.index(engine.head)]
+        neck = self.order[engine.index(engine.body[1])]
+        if (head - neck) % self.size != 1:
+            self.order = [self.size - 1 - i for i in self.order]
+
+    @staticmethod
+    def build_cycle(cols, rows):
+        """Position along a Hamiltonian cycle of every flat cell index."""
+        if rows % 2 and cols % 2:
+            raise ValueError("a Hamiltonian cycle needs an even number of rows or columns")
+
+        transpose = rows % 2 == 1
+        if transpose:
+            cols, rows = rows, cols
+
+        # Row 0 left to right, zig-zag the other rows over columns 1.., back up column 0
+        cells = [(x, 0) for x in range(cols)]
+        for y in range(1, rows):
+            xs = range(cols - 1, 0, -1) if y % 2 else range(1, cols)
+            cells.extend((x, y) for x in xs)
+        cells.extend((0, y) for y in range(rows - 1, 0, -1))
+
+        order = [0] * (cols * rows)
+        for position, (x, y) in enumerate(cells):
+            if transpose:
+                x, y = y, x
+                order[y * rows + x] = position
+            else:
+                order[y * cols + x] = position
+        return order
+
+    def distance(self, a, b):
+        """Cycle distance from cell index a forward to b."""
+        return (self.order[b] - self.order[a]) % self.size
+
+    def plan(self, engine):
+        if self.order is None or len(self.order) != engine.cols * engine.rows:
+            self.reset(engine)
+
+        head = engine.index(engine.head)
+        tail_gap = self.distance(head, engine.index(engine.tail))
+        food = engine.index(engine.food)
+        shortcuts = len(engine.body) < self.shortcut_fill * self.size
+
+        best, best_gap = None, None
+        for direction, cell in neighbours(engine, engine.head):
+            if engine.check_collision(cell) or direction == OPPOSITE[engine.direction]:
+                continue
+            i = engine.index(cell)
+            step = self.distance(head, i)
+            if step != 1 and (not shortcuts or step >= tail_gap - self.margin):
+                continue
+            food_gap = self.distance(i, food)
+            if best_gap is None or food_gap < best_gap:
+                best, best_gap = direction, food_gap
+
+        return [best] if best else None
+
+
+STRATEGIES = {cls.name: cls for cls in (GreedyBFS, AStarSafe, HamiltonianCycle)}
+
+
+class Autopilot:
+    """Steers a SnakeEngine with a planning strategy.
+
+    Planned paths are kept and followed tick by tick while the food hasn't
+    moved and the next step is still free, so the strategy only replans
+    when something relevant changed.
+    """
+
+    def __init__(self, strategy="astar"):
+        self.strategy = STRATEGIES[strategy]() if isinstance(strategy, str) else strategy
+        self.path = deque()
+        self.target = None
+        self.plans = 0
+        self.plan_time = 0.0
+
+    def reset(self, engine):
+        self.path.clear()
+        self.target = None
+        self.strategy.reset(engine)
+
+    def next_direction(self, engine):
+        """Direction to feed into change_direction for the next tick."""
+        if self.path and self.target == engine.food:
+            direction = self.path[0]
+            if direction != OPPOSITE[engine.direction] and not engine.check_collision(engine.next_head(direction)):
+                return self.path.popleft()
+
+        start = time.perf_counter()
+        path = self.strategy.plan(engine)
+        if not path:
+            path = [safest_direction(engine) or engine.direction]
+        self.plan_time += time.perf_counter() - start
+        self.plans += 1
+
+        self.path = deque(path)
+        self.target = engine.food
+        return self.path.popleft()
+
+
+def play(strategy, cols, rows, seed, max_moves=100000, max_idle=None):
+    """Play one headless game; return (score, moves, foods, plan_time).
+
+    Games stop after max_moves, or after max_idle moves without eating
+    (a strategy circling forever).
+    """
+    engine = SnakeEngine(cols, rows, seed=seed)
+    pilot = Autopilot(strategy)
+    pilot.reset(engine)
+    max_idle = max_idle or cols * rows * 2
+
+    moves = foods = idle = 0
+    while not engine.game_over and idle < max_idle and moves < max_moves:
+        engine.change_direction(pilot.next_direction(engine))
+        result = engine.step()
+        moves += 1
+        idle += 1
+        if result in (ATE, WON):
+            foods += 1
+            idle = 0
+        elif result == DIED:
+            break
+
+    return engine.score, moves, foods, pilot.plan_time
+
+
+def benchmark(strategies, grids, games, seed, max_moves):
+    """Print average score, moves per food and planning time per tick."""
+    print(f"{'strategy':<12} {'grid':>9} {'score':>9} {'moves/food':>11} {'plan us/tick':>13}")
+    for cols, rows in grids:
+        for name in strategies:
+            if name == "hamiltonian" and cols % 2 and rows % 2:
+                continue
+            scores = moves = foods = 0
+            plan_time = 0.0
+            for game in range(games):
+                s, m, f, t = play(name, cols, rows, seed + game, max_moves)
+                scores += s
+                moves += m
+                foods += f
+                plan_time += t
+            print(f"{name:<12} {f'{cols}x{rows}':>9} {scores / games:>9.1f} "
+                  f"{moves / max(foods, 1):>11.1f} {plan_time / max(moves, 1) * 1e6:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the snake autopilot strategies")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), action="append")
+    parser.add_argument("--grid", action="append", metavar="COLSxROWS",
+                        help="grid size, may be repeated (default 30x20 and 100x100)")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-moves", type=int, default=100000, help="move cap per game")
+    args = parser.parse_args()
+
+    grids = [tuple(int(n) for n in grid.split("x")) for grid in args.grid or ["30x20", "100x100"]]
+    benchmark(args.strategy or sorted(STRATEGIES), grids, args.games, args.seed, args.max_moves)
+
+
+if __name__ == "__main__":
+    main()
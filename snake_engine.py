@@ -0,0 +1,169 @@
+import random
+from array import array
+from collections import deque
+
+
+# Direction name -> (dx, dy) in grid cells
+DIRECTIONS = {
+    "Up": (0, -1),
+    "Down": (0, 1),
+    "Left": (-1, 0),
+    "Right": (1, 0),
+}
+
+OPPOSITE = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
+
+# Results of SnakeEngine.step()
+MOVED = "moved"
+ATE = "ate"
+DIED = "died"
+WON = "won"
+
+
+class SnakeEngine:
+    """Snake rules on a grid of cells, independent of any GUI.
+
+    The body is a deque (head first) mirrored by an occupancy bytearray,
+    so moving, growing and collision checks are O(1) regardless of length.
+    Free cells are kept in a swap-remove index so food placement is O(1)
+    too; the index is two int arrays, 8 bytes a cell, so even a world of
+    millions of cells stays small. Positions are (col, row) cell coordinates.
+    """
+
+    START_BODY = ((5, 5), (4, 5), (3, 5))
+
+    def __init__(self, cols=30, rows=20, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.reset()
+
+    def reset(self, seed=None):
+        """Reset the snake, score and food to the initial state.
+
+        The food sequence depends only on the seed, so a game can be replayed
+        from its seed and inputs. Without a new seed the previous one is reused.
+        """
+        if seed is not None:
+            self.seed = seed
+        self.rng = random.Random(self.seed)
+
+        self.direction = "Right"
+        self.next_direction = "Right"
+        self.score = 0
+        self.game_over = False
+        self.vacated = None  # tail cell freed by the last step, if any
+
+        size = self.cols * self.rows
+        self.occupied = bytearray(size)
+        # free holds every unoccupied flat index, free_pos[i] is its slot there
+        self.free = array("i", range(size))
+        self.free_pos = array("i", range(size))
+
+        self.body = deque()
+        for cell in self.START_BODY:
+            self.body.append(cell)
+            self.occupy(cell)
+
+        self.food = self.create_food()
+
+    def index(self, cell):
+        """Flat occupancy index of a (col, row) cell."""
+        return cell[1] * self.cols + cell[0]
+
+    @property
+    def head(self):
+        return self.body[0]
+
+    @property
+    def tail(self):
+        return self.body[-1]
+
+    def __len__(self):
+        return len(self.body)
+
+    def is_occupied(self, cell):
+        return self.occupied[self.index(cell)] == 1
+
+    def occupy(self, cell):
+        """Mark a cell as covered by the snake and drop it from the free index."""
+        i = cell[1] * self.cols + cell[0]
+        self.occupied[i] = 1
+
+        # Swap the last free cell into this slot, then shrink the list
+        slot = self.free_pos[i]
+        last = self.free.pop()
+        if last != i:
+            self.free[slot] = last
+            self.free_pos[last] = slot
+
+    def release(self, cell):
+        """Mark a cell as free again and add it back to the free index."""
+        i = cell[1] * self.cols + cell[0]
+        self.occupied[i] = 0
+        self.free_pos[i] = len(self.free)
+        self.free.append(i)
+
+    def create_food(self):
+        """Pick a random free cell, or None when the snake fills the board."""
+        if not self.free:
+            return None
+
+        i = self.free[self.rng.randrange(len(self.free))]
+        return (i % self.cols, i // self.cols)
+
+    def change_direction(self, new_direction):
+        """Queue a direction change unless it would reverse onto the body."""
+        if new_direction in DIRECTIONS and new_direction != OPPOSITE[self.direction]:
+            self.next_direction = new_direction
+
+    def next_head(self, direction=None):
+        """Cell the head would move into for the given direction."""
+        dx, dy = DIRECTIONS[direction or self.next_direction]
+        head_x, head_y = self.body[0]
+        return (head_x + dx, head_y + dy)
+
+    def check_collision(self, cell):
+        """Check if the cell collides with walls or the snake body."""
+        x, y = cell
+
+        # Check wall collision
+        if x < 0 or x >= self.cols or y < 0 or y >= self.rows:
+            return True
+
+        # Check self collision (excluding the tail which will move)
+        return self.occupied[y * self.cols + x] == 1 and cell != self.body[-1]
+
+    def step(self):
+        """Advance the snake one cell and return MOVED, ATE, DIED or WON."""
+        if self.game_over:
+            return DIED
+
+        self.direction = self.next_direction
+        new_head = self.next_head(self.direction)
+        self.vacated = None
+
+        if self.check_collision(new_head):
+            self.game_over = True
+            return DIED
+
+        if new_head == self.food:
+            self.body.appendleft(new_head)
+            self.occupy(new_head)
+            self.score += 10
+            self.food = self.create_food()
+
+            # No free cell left for food: the snake covers the whole board
+            if self.food is None:
+                self.game_over = True
+                return WON
+            return ATE
+
+        # Free the tail before claiming the head, the two may be the same cell
+        tail = self.body.pop()
+        self.release(tail)
+        self.vacated = tail
+
+        self.body.appendleft(new_head)
+        self.occupy(new_head)
+        return MOVED
@@ -0,0 +1,181 @@
+import argparse
+import time
+
+import numpy as np
+
+
+# Action index -> direction, matching snake_engine.DIRECTIONS
+ACTIONS = ("Up", "Down", "Left", "Right")
+DX = np.array([0, 0, -1, 1], dtype=np.int32)
+DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+# Observation cell values
+EMPTY = 0
+BODY = 1
+HEAD = 2
+FOOD = 3
+
+FOOD_REWARD = 10
+START_BODY = ((3, 5), (4, 5), (5, 5))  # tail first, head last
+NEVER = np.iinfo(np.int64).min // 2
+
+
+class SnakeVecEnv:
+    """N independent snake boards stepped together with one batched call.
+
+    Same rules as SnakeEngine: the snake dies on a wall or on its own body
+    (the tail, which moves away, doesn't count), food is worth +10 and a
+    reversed action is ignored. Finished boards reset automatically.
+
+    Instead of storing the body, every board records the tick at which the
+    head last entered each cell. A cell is covered while that tick is within
+    the last `length` ticks, so moving, growing and collision checks are a
+    few array operations for all boards at once.
+    """
+
+    def __init__(self, num_envs, cols=30, rows=20, seed=None):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.num_cells = cols * rows
+        self.rng = np.random.default_rng(seed)
+        self.envs = np.arange(num_envs)
+
+        self.entered = np.full((num_envs, self.num_cells), NEVER, dtype=np.int64)
+        self.tick = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.head_x = np.zeros(num_envs, dtype=np.int32)
+        self.head_y = np.zeros(num_envs, dtype=np.int32)
+        self.direction = np.zeros(num_envs, dtype=np.int8)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)  # score of each board's last finished game
+
+        self.reset()
+
+    def reset(self):
+        """Reset every board and return the observations."""
+        self._reset_envs(self.envs)
+        return self.observation()
+
+    def _reset_envs(self, envs):
+        self.entered[envs] = NEVER
+        for tick, (x, y) in enumerate(START_BODY):
+            self.entered[envs, y * self.cols + x] = tick
+
+        head_x, head_y = START_BODY[-1]
+        self.tick[envs] = len(START_BODY) - 1
+        self.length[envs] = len(START_BODY)
+        self.head_x[envs] = head_x
+        self.head_y[envs] = head_y
+        self.direction[envs] = ACTIONS.index("Right")
+        self.scores[envs] = 0
+        self._place_food(envs)
+
+    def occupied(self):
+        """Boolean (num_envs, num_cells) array of cells covered by a snake."""
+        return self.entered > (self.tick - self.length)[:, None]
+
+    def _place_food(self, envs):
+        """Put food on a random free cell of each given board (-1 if full)."""
+        pending = envs
+        for _ in range(8):
+            cells = self.rng.integers(0, self.num_cells, size=len(pending))
+            free = self.entered[pending, cells] <= self.tick[pending] - self.length[pending]
+            self.food[pending[free]] = cells[free]
+            pending = pending[~free]
+            if not len(pending):
+                return
+
+        # Nearly full boards: choose among the free cells directly
+        for env in pending:
+            free = np.flatnonzero(self.entered[env] <= self.tick[env] - self.length[env])
+            self.food[env] = self.rng.choice(free) if len(free) else -1
+
+    def step(self, actions):
+        """Apply one action per board.
+
+        Returns (observations, rewards, dones); boards that are done have
+        already been reset and their observation is the new first frame.
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        reverse = actions == OPPOSITE[self.direction]
+        direction = np.where(reverse, self.direction, actions)
+        self.direction = direction
+
+        new_x = self.head_x + DX[direction]
+        new_y = self.head_y + DY[direction]
+        wall = (new_x < 0) | (new_x >= self.cols) | (new_y < 0) | (new_y >= self.rows)
+        cells = np.clip(new_y, 0, self.rows - 1) * self.cols + np.clip(new_x, 0, self.cols - 1)
+
+        # The tail entered exactly `length` ticks before the new head, so it is excluded
+        next_tick = self.tick + 1
+        body = self.entered[self.envs, cells] > next_tick - self.length
+        dead = wall | body
+
+        alive = self.envs[~dead]
+        cells = cells[alive]
+        ate = cells == self.food[alive]
+
+        self.head_x[alive] = new_x[alive]
+        self.head_y[alive] = new_y[alive]
+        self.tick[alive] = next_tick[alive]
+        self.entered[alive, cells] = next_tick[alive]
+        self.length[alive] += ate
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        eaters = alive[ate]
+        rewards[eaters] = FOOD_REWARD
+        self.scores[eaters] += FOOD_REWARD
+        if len(eaters):
+            self._place_food(eaters)
+
+        # A board without room for food has been won
+        dones = dead | (self.food < 0)
+        finished = self.envs[dones]
+        if len(finished):
+            self.final_scores[finished] = self.scores[finished]
+            self._reset_envs(finished)
+
+        return self.observation(), rewards, dones
+
+    def observation(self):
+        """int8 (num_envs, rows, cols) boards of EMPTY, BODY, HEAD and FOOD."""
+        obs = self.occupied().astype(np.int8)
+        obs[self.envs, self.head_y * self.cols + self.head_x] = HEAD
+        has_food = self.food >= 0
+        obs[self.envs[has_food], self.food[has_food]] = FOOD
+        return obs.reshape(self.num_envs, self.rows, self.cols)
+
+
+def benchmark(num_envs, steps, cols, rows, seed):
+    """Step random actions and report total throughput."""
+    env = SnakeVecEnv(num_envs, cols, rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    games = 0
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, dones = env.step(rng.integers(0, len(ACTIONS), size=num_envs))
+        games += int(dones.sum())
+    elapsed = time.perf_counter() - start
+
+    total = num_envs * steps
+    print(f"{num_envs} boards x {steps} steps on {cols}x{rows}: {elapsed:.2f}s")
+    print(f"{total / elapsed:,.0f} steps/s ({total / elapsed * 60:,.0f} steps/min), {games} games finished")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched snake environment")
+    parser.add_argument("--envs", type=int, default=1024)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--cols", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.envs, args.steps, args.cols, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
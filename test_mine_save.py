@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from mine_field import MineField, FLAG, QUESTION
+from mine_generator import neighbour_counts
+from mine_save import HEADER, MAGIC, load_game, save_game
+
+
+def random_position(rows, cols, num_mines, rng):
+    """A MineField with mines, revealed cells and marks scattered at random."""
+    field = MineField(rows, cols, num_mines)
+    mines = rng.sample(range(rows * cols), num_mines)
+    field.board = neighbour_counts(rows, cols, mines)
+    mine_set = set(mines)
+    for i in range(rows * cols):
+        if i not in mine_set and rng.random() < 0.5:
+            field.revealed[i] = 1
+            field.cells_revealed += 1
+        elif rng.random() < 0.3:
+            field.marks[i] = rng.choice((FLAG, QUESTION))
+            field.flags += field.marks[i] == FLAG
+    return field
+
+
+def same_cells(a, b):
+    return all(
+        a.is_revealed(row, col) == b.is_revealed(row, col)
+        and a.mark(row, col) == b.mark(row, col)
+        and a.count(row, col) == b.count(row, col)
+        for row in range(a.rows) for col in range(a.cols)
+    )
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_round_trip(tmp_path, seed):
+    path = str(tmp_path / "game.msw")
+    rng = random.Random(seed)
+    rows, cols = rng.randint(1, 40), rng.randint(1, 40)
+    field = random_position(rows, cols, rng.randint(0, rows * cols // 3), rng)
+    game_seed = rng.getrandbits(64)
+    save_game(path, field, game_seed, 12.5)
+
+    mapped = load_game(path)
+    assert (mapped.rows, mapped.cols, mapped.num_mines, mapped.seed, mapped.elapsed) \
+        == (rows, cols, field.num_mines, game_seed, 12.5)
+    assert (mapped.flags, mapped.cells_revealed) == (field.flags, field.cells_revealed)
+    assert same_cells(field, mapped)
+
+    decoded = mapped.to_field()
+    assert decoded.board == field.board
+    assert decoded.revealed == field.revealed
+    assert decoded.marks == field.marks
+
+    # Play on the mapped copy, save it and read it back
+    mapped.cycle_mark(rng.randrange(rows), rng.randrange(cols))
+    mapped.flood(rng.randrange(rows), rng.randrange(cols))
+    save_game(path, mapped, game_seed, 20.0)
+    reloaded = load_game(path)
+    assert same_cells(mapped, reloaded)
+    assert (reloaded.flags, reloaded.cells_revealed) == (mapped.flags, mapped.cells_revealed)
+    assert reloaded.elapsed == 20.0
+    mapped.close()
+    reloaded.close()
+
+
+def test_moves_stay_out_of_the_file_until_saved(tmp_path):
+    path = str(tmp_path / "game.msw")
+    field = random_position(12, 15, 20, random.Random(1))
+    save_game(path, field, 1, 0.0)
+    with open(path, "rb") as file:
+        saved = file.read()
+
+    mapped = load_game(path)
+    for row in range(mapped.rows):
+        mapped.cycle_mark(row, row)
+    mapped.close()
+    with open(path, "rb") as file:
+        assert file.read() == saved
+
+
+def test_bad_files_are_rejected(tmp_path):
+    path = str(tmp_path / "game.msw")
+    save_game(path, random_position(8, 8, 10, random.Random(2)), 2, 0.0)
+    with open(path, "rb") as file:
+        data = file.read()
+
+    bad = {
+        "short": data[:HEADER.size - 1],
+        "magic": b"NOPE" + data[len(MAGIC):],
+        "version": data[:len(MAGIC)] + b"\x09" + data[len(MAGIC) + 1:],
+        "truncated": data[:-1],
+    }
+    for name, content in bad.items():
+        bad_path = tmp_path / f"{name}.msw"
+        bad_path.write_bytes(content)
+        with pytest.raises(ValueError):
+            load_game(str(bad_path))